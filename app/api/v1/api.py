@@ -1,11 +1,10 @@
 from fastapi import APIRouter
 
 from app.api.v1.endpoints import auth, users, events, notifications
+from app.core.responses import ORJSONResponse
 
 api_router = APIRouter()
  
-# Include all route modules
-api_router.include_router(auth.router)
-api_router.include_router(users.router)
-api_router.include_router(events.router)
-api_router.include_router(notifications.router)
\ No newline at end of file
+# Include all route modules, rendering plain JSON responses with orjson
+for router in (auth.router, users.router, events.router, notifications.router):
+    api_router.include_router(router, default_response_class=ORJSONResponse)
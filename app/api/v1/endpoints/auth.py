@@ -1,24 +1,147 @@
 from datetime import timedelta
 from typing import Any
+import hashlib
+import hmac
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import Cache
 from app.core.config import settings
+from app.core.responses import ORJSONResponse
 from app.core.security import (
     create_access_token,
     create_token_pair,
     verify_token,
+    averify_password,
     get_password_hash,
-    verify_password,
+    password_needs_rehash,
     get_current_user
 )
 from app.db.database import get_db
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserResponse
-from app.crud.user import create_user, get_user_by_email
+from app.crud.user import create_user, get_user_by_email, rehash_password
 from app.models.user import User
 
+# Authorization scheme, compared in constant time (headers arrive latin-1 decoded)
+_BEARER = b"Bearer"
+
+# Verified against when the email is unknown, so both login paths cost one bcrypt check
+_DUMMY_HASH = get_password_hash("!invalid!")
+
+# Recently verified logins, so repeat logins within the TTL skip bcrypt.
+# Keys are HMAC digests that also cover the stored hash, so a password
+# change invalidates any cached entry for that user.
+_login_cache = Cache(default_ttl=300)
+
+def _login_cache_key(user: User, password: str) -> str:
+    """Build the verified-login cache key without keeping the plaintext password"""
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(),
+        f"{user.hashed_password}:{password}".encode(),
+        hashlib.sha256
+    ).hexdigest()
+    return f"{user.email}:{digest}"
+
+async def _check_password(user: User, password: str) -> bool:
+    """Verify a login password, reusing a recent successful bcrypt check"""
+    key = _login_cache_key(user, password)
+    if await _login_cache.get(key):
+        return True
+    if not await averify_password(password, user.hashed_password):
+        return False
+    await _login_cache.set(key, True)
+    return True
+
+# OpenAPI response docs, built once at import and shared by the route decorators
+_TOKEN_PAIR_EXAMPLE = {
+    "access_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1...",
+    "refresh_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1...",
+    "token_type": "bearer"
+}
+
+_LOGIN_RESPONSES = {
+    200: {
+        "description": "Successful login",
+        "content": {
+            "application/json": {
+                "example": _TOKEN_PAIR_EXAMPLE
+            }
+        }
+    },
+    401: {
+        "description": "Invalid credentials",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Incorrect email or password"}
+            }
+        }
+    }
+}
+
+_REGISTER_RESPONSES = {
+    201: {
+        "description": "User successfully created",
+        "content": {
+            "application/json": {
+                "example": {
+                    "id": 1,
+                    "email": "user@example.com",
+                    "username": "johndoe"
+                }
+            }
+        }
+    },
+    400: {
+        "description": "Email already registered",
+        "content": {
+            "application/json": {
+                "example": {"detail": "A user with this email already exists"}
+            }
+        }
+    }
+}
+
+_REFRESH_RESPONSES = {
+    200: {
+        "description": "New token pair generated successfully",
+        "content": {
+            "application/json": {
+                "example": _TOKEN_PAIR_EXAMPLE
+            }
+        }
+    },
+    401: {
+        "description": "Invalid or expired refresh token",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Invalid refresh token"}
+            }
+        }
+    }
+}
+
+_LOGOUT_RESPONSES = {
+    200: {
+        "description": "Successfully logged out",
+        "content": {
+            "application/json": {
+                "example": {"message": "Successfully logged out"}
+            }
+        }
+    },
+    401: {
+        "description": "Not authenticated",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Not authenticated"}
+            }
+        }
+    }
+}
+
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"],
@@ -41,28 +164,7 @@ router = APIRouter(
     The access token is valid for a limited time, while the refresh token can be used
     to obtain new access tokens without re-authentication.
     """,
-    responses={
-        200: {
-            "description": "Successful login",
-            "content": {
-                "application/json": {
-                    "example": {
-                        "access_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1...",
-                        "refresh_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1...",
-                        "token_type": "bearer"
-                    }
-                }
-            }
-        },
-        401: {
-            "description": "Invalid credentials",
-            "content": {
-                "application/json": {
-                    "example": {"detail": "Incorrect email or password"}
-                }
-            }
-        }
-    }
+    responses=_LOGIN_RESPONSES
 )
 async def login(
     db: AsyncSession = Depends(get_db),
@@ -75,19 +177,26 @@ async def login(
     - **password**: User's password
     """
     user = await get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if user is not None:
+        authenticated = await _check_password(user, form_data.password)
+    else:
+        await averify_password(form_data.password, _DUMMY_HASH)
+        authenticated = False
+    if not authenticated:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if password_needs_rehash(user.hashed_password):
+        await rehash_password(db, db_user=user, password=form_data.password)
     
     access_token, refresh_token = create_token_pair({"sub": user.email})
-    return {
+    return ORJSONResponse({
         "access_token": access_token,
         "refresh_token": refresh_token,
         "token_type": "bearer"
-    }
+    })
 
 @router.post(
     "/register",
@@ -103,34 +212,13 @@ async def login(
     * Creates a new user record
     * Returns the created user's basic information
     """,
-    responses={
-        201: {
-            "description": "User successfully created",
-            "content": {
-                "application/json": {
-                    "example": {
-                        "id": 1,
-                        "email": "user@example.com",
-                        "username": "johndoe"
-                    }
-                }
-            }
-        },
-        400: {
-            "description": "Email already registered",
-            "content": {
-                "application/json": {
-                    "example": {"detail": "A user with this email already exists"}
-                }
-            }
-        }
-    }
+    responses=_REGISTER_RESPONSES
 )
 async def register(
     *,
     db: AsyncSession = Depends(get_db),
     user_in: UserCreate
-) -> UserResponse:
+) -> Any:
     """
     Register a new user with the following information:
     
@@ -138,21 +226,31 @@ async def register(
     - **password**: Strong password (min 8 characters)
     - **username**: Optional username
     """
-    user = await get_user_by_email(db, email=user_in.email)
-    if user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A user with this email already exists",
-        )
-    
     try:
         user = await create_user(db, user_in)
-        return UserResponse(id=user.id, email=user.email, username=user.username)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred: {str(e)}"
         )
+    
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A user with this email already exists",
+        )
+    # Built directly from the inserted row; matches UserResponse without re-validating it
+    return ORJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "id": user.id,
+            "email": user.email,
+            "username": user.username,
+            "full_name": user.full_name,
+            "is_active": user.is_active,
+            "is_superuser": user.is_superuser
+        }
+    )
 
 @router.post(
     "/refresh",
@@ -165,28 +263,7 @@ async def register(
     to re-authenticate. The refresh token must be provided in the Authorization header
     with the Bearer prefix.
     """,
-    responses={
-        200: {
-            "description": "New token pair generated successfully",
-            "content": {
-                "application/json": {
-                    "example": {
-                        "access_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1...",
-                        "refresh_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1...",
-                        "token_type": "bearer"
-                    }
-                }
-            }
-        },
-        401: {
-            "description": "Invalid or expired refresh token",
-            "content": {
-                "application/json": {
-                    "example": {"detail": "Invalid refresh token"}
-                }
-            }
-        }
-    }
+    responses=_REFRESH_RESPONSES
 )
 async def refresh_token(
     db: AsyncSession = Depends(get_db),
@@ -197,48 +274,39 @@ async def refresh_token(
     
     - **authorization**: Valid refresh token with Bearer prefix (provided in Authorization header)
     """
-    try:
-        # Extract token from Authorization header
-        if not authorization.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authorization header format",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        refresh_token = authorization.split(" ")[1]
-        
-        payload = verify_token(refresh_token, "refresh")
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        user = await get_user_by_email(db, email=email)
-        if not user or not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        access_token, new_refresh_token = create_token_pair({"sub": user.email})
-        return {
-            "access_token": access_token,
-            "refresh_token": new_refresh_token,
-            "token_type": "bearer"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception:
+    # Extract token from Authorization header
+    scheme, _, refresh_token = authorization.partition(" ")
+    if not hmac.compare_digest(scheme.encode("latin-1"), _BEARER) or not refresh_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header format",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # verify_token maps every JWTError (expiry included) to a 401 itself
+    payload = verify_token(refresh_token, "refresh")
+    email = payload.get("sub")
+    if not email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user = await get_user_by_email(db, email=email)
+    if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    access_token, new_refresh_token = create_token_pair({"sub": user.email})
+    return ORJSONResponse({
+        "access_token": access_token,
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer"
+    })
 
 @router.post(
     "/logout",
@@ -249,24 +317,7 @@ async def refresh_token(
     This endpoint invalidates the current session. The client should discard
     both access and refresh tokens after calling this endpoint.
     """,
-    responses={
-        200: {
-            "description": "Successfully logged out",
-            "content": {
-                "application/json": {
-                    "example": {"message": "Successfully logged out"}
-                }
-            }
-        },
-        401: {
-            "description": "Not authenticated",
-            "content": {
-                "application/json": {
-                    "example": {"detail": "Not authenticated"}
-                }
-            }
-        }
-    }
+    responses=_LOGOUT_RESPONSES
 )
 async def logout(
     current_user: User = Depends(get_current_user)
@@ -293,17 +344,18 @@ async def get_current_user_from_token(token: str, db: AsyncSession = Depends(get
     Returns the current user if the token is valid.
     Raises HTTPException if the token is invalid or expired.
     """
-    user_id = verify_token(token)  # Implement this function to decode the token and extract user ID
-    if user_id is None:
+    payload = verify_token(token)
+    email = payload.get("sub")
+    if email is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Fetch the user from the database
-    user = await db.execute(User.select().where(User.id == user_id))
+    # Fetch the user from the database (indexed lookup on the unique email column)
+    user = await db.scalar(select(User).where(User.email == email))
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    return user
\ No newline at end of file
+    return user
@@ -1,6 +1,7 @@
-from typing import List, Dict, Any
-from datetime import datetime, UTC
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import hashlib
+from typing import Annotated, List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_user
@@ -19,14 +20,38 @@ from app.schemas.event import (
     UserInfo
 )
 from app.crud import event as crud_event
-from app.core.cache import cached
-from app.core.responses import DynamicResponse
-from app.core.queries import DateRangeQuery, EventFilter
-from app.utils.event_utils import create_event_response
+from app.core.cache import Cache
+from app.core.responses import DynamicResponse, etag_matches
+from app.core.queries import DateRangeQuery, EventFilter, UTCDateTime
+from app.utils.event_utils import build_event_response
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Event list pages keyed per user and listing generation (see crud invalidate_event_lists)
+_event_list_cache = Cache(default_ttl=300)
+
+async def _get_authorized_event(
+    db: AsyncSession,
+    event_id: int,
+    user: User,
+    required_role: str = UserRole.VIEWER,
+    with_owner: bool = False
+):
+    """Fetch an event the user may access, raising 404/403 otherwise"""
+    authorized = await crud_event.get_event_authorized(
+        db, event_id, user, required_role, with_owner=with_owner
+    )
+    if authorized is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    event, allowed = authorized
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return event
+
+# (owner_id, serialized EventResponse, ETag) keyed per event and generation (see crud invalidate_event)
+_event_cache = Cache(default_ttl=300)
+
 router = APIRouter(
     prefix="/events",
     tags=["Events"],
@@ -91,17 +116,8 @@ async def create_event(
     
     Returns the created event.
     """
+    # EventCreate already made both times UTC-aware and checked their order
     try:
-        # Ensure start_time and end_time are timezone-aware
-        if not event_in.start_time.tzinfo:
-            event_in.start_time = event_in.start_time.replace(tzinfo=UTC)
-        if not event_in.end_time.tzinfo:
-            event_in.end_time = event_in.end_time.replace(tzinfo=UTC)
-        
-        # Validate that end_time is after start_time
-        if event_in.start_time >= event_in.end_time:
-            raise ValueError("End time must be after start time")
-        
         db_event = await crud_event.create_event(
             db,
             event_in,
@@ -109,7 +125,8 @@ async def create_event(
             check_conflicts=check_conflicts
         )
         
-        return await create_event_response(db, db_event)
+        # The new event is owned by the current user, so no owner lookup is needed
+        return build_event_response(db_event, current_user)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -163,12 +180,7 @@ async def create_events_batch(
     
     Each event in the batch requires the same fields as single event creation.
     """
-    if len(batch_in.events) > 50:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot create more than 50 events at once"
-        )
-    
+    # EventBatchCreate already bounds the batch to 1-50 events
     try:
         db_events = await crud_event.create_events_batch(
             db,
@@ -177,7 +189,8 @@ async def create_events_batch(
             check_conflicts=check_conflicts
         )
         
-        return [await create_event_response(db, event) for event in db_events]
+        # Every event in the batch is owned by the current user
+        return [build_event_response(event, current_user) for event in db_events]
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -234,16 +247,18 @@ async def create_events_batch(
         500: {"description": "Internal server error"}
     }
 )
-@cached(ttl=300)  # Cache for 5 minutes
 async def list_events(
     *,
     db: AsyncSession = Depends(get_db),
-    start_time: datetime = Query(..., description="Start of date range (ISO format)"),
-    end_time: datetime = Query(..., description="End of date range (ISO format)"),
+    start_time: Annotated[UTCDateTime, Query(description="Start of date range (ISO format)")],
+    end_time: Annotated[UTCDateTime, Query(description="End of date range (ISO format)")],
     include_recurring: bool = Query(True, description="Include recurring event occurrences"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Items per page"),
-    current_user: User = Depends(get_current_user)
+    after_start_time: Annotated[Optional[UTCDateTime], Query(description="Start time of the last item already seen (keyset pagination)")] = None,
+    after_id: Optional[int] = Query(None, description="ID of the last item already seen (keyset pagination)"),
+    current_user: User = Depends(get_current_user),
+    response: Response
 ) -> EventListResponse:
     """
     List events in a date range.
@@ -254,6 +269,8 @@ async def list_events(
     - **include_recurring**: Include recurring event occurrences (default: true)
     - **page**: Page number (default: 1)
     - **size**: Items per page (default: 10, max: 100)
+    - **after_start_time**, **after_id**: Continue after this item instead of
+      skipping to **page**; pass the last item's start_time and id
     
     Returns a paginated list of events in the specified date range.
     """
@@ -262,48 +279,69 @@ async def list_events(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="End time must be after start time"
         )
+    if (after_start_time is None) != (after_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="after_start_time and after_id must be given together"
+        )
+    after = (after_start_time, after_id) if after_start_time is not None else None
     
-    try:
-        # Calculate skip from page and size
-        skip = (page - 1) * size
-        
-        # Get all events in the range
-        all_events = await crud_event.get_events_in_range(
-            db,
-            current_user,
-            start_time,
-            end_time,
-            include_recurring=include_recurring,
-            skip=0,
-            limit=None
+    cache_key = (
+        f"{current_user.id}:{crud_event.event_list_generation(current_user.id)}:"
+        f"{start_time.isoformat()}:{end_time.isoformat()}:{include_recurring}:{page}:{size}:"
+        f"{after_start_time.isoformat() if after else ''}:{after_id}"
+    )
+    # Pages are cached as serialized JSON, so hits skip serialization too
+    body = await _event_list_cache.get(cache_key)
+    if body is None:
+        body = await _render_event_list(
+            db, current_user, start_time, end_time, include_recurring, page, size, after
         )
+        await _event_list_cache.set(cache_key, body)
+    
+    # Returned directly, so carry over headers set by dependencies (Cache-Control)
+    return Response(content=body, media_type="application/json", headers=response.headers)
+
+async def _render_event_list(
+    db: AsyncSession,
+    current_user: User,
+    start_time: datetime,
+    end_time: datetime,
+    include_recurring: bool,
+    page: int,
+    size: int,
+    after: Optional[Tuple[datetime, int]] = None
+) -> bytes:
+    """Build one page of list_events and serialize it to JSON in a single pass"""
+    try:
+        # Calculate skip from page and size; a keyset cursor replaces the offset
+        skip = 0 if after else (page - 1) * size
         
-        # Calculate total for pagination
-        total = len(all_events)
-        
-        # Get paginated events
-        events = await crud_event.get_events_in_range(
+        # Get the page and the range total in one pass
+        events, total = await crud_event.get_events_page(
             db,
             current_user,
             start_time,
             end_time,
             include_recurring=include_recurring,
             skip=skip,
-            limit=size
+            limit=size,
+            after=after
         )
         
-        event_responses = []
-        for event_data in events:
-            event = event_data["event"]
-            event_response = await create_event_response(
-                db,
-                event,
+        # Fetch the page's owners in one query rather than one per event
+        owners = await crud_event.get_owners(db, (event_data["event"] for event_data in events))
+        event_responses = [
+            build_event_response(
+                event_data["event"],
+                owners[event_data["event"].owner_id],
                 start_time=event_data["start_time"],
                 end_time=event_data["end_time"]
             )
-            event_responses.append(event_response)
+            for event_data in events
+        ]
         
-        return EventListResponse(
+        listing = EventListResponse(
             items=event_responses,
             total=total,
             page=page,
@@ -316,6 +354,7 @@ async def list_events(
                 )
             )
         )
+        return listing.model_dump_json().encode()
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -363,12 +402,13 @@ async def list_events(
         }
     }
 )
-@cached(ttl=60)  # Cache for 1 minute since event details might change frequently
 async def get_event(
     *,
     db: AsyncSession = Depends(get_db),
     event_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response
 ) -> EventResponse:
     """
     Get detailed information about a specific event.
@@ -377,26 +417,36 @@ async def get_event(
     - **event_id**: ID of the event to retrieve
     
     Returns the event details if the user has permission to view it.
+    Honors If-None-Match with 304 Not Modified.
     """
-    event = await crud_event.get_event(db, event_id)
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found"
-        )
+    # Cache-aside on (event, generation); crud bumps the generation on every write
+    cache_key = f"{event_id}:{crud_event.event_generation(event_id)}"
+    cached_event = await _event_cache.get(cache_key)
+    if cached_event is None:
+        event = await crud_event.get_event(db, event_id)
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        owner = await crud_event.get_owner(db, event)
+        body = build_event_response(event, owner).model_dump_json().encode()
+        etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        cached_event = (event.owner_id, body, etag)
+        await _event_cache.set(cache_key, cached_event)
+    owner_id, body, etag = cached_event
     
-    # Check permissions
-    if not await crud_event.has_permission(db, event, current_user):
+    # Check permissions on every request; roles are cached separately
+    if not await crud_event.has_event_role(db, event_id, owner_id, current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    owner = await crud_event.get_owner(db, event)
-    return EventResponse(
-        **event.__dict__,
-        created_by={"id": owner.id, "email": owner.email}
-    )
+    response.headers["ETag"] = etag
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response.headers)
+    return Response(content=body, media_type="application/json", headers=response.headers)
 
 @router.put(
     "/{event_id}",
@@ -468,11 +518,9 @@ async def update_event(
     Requires EDITOR role or higher.
     Creates a new version in the event history.
     """
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not db_event.has_permission(current_user, required_role=UserRole.EDITOR):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_event = await _get_authorized_event(
+        db, event_id, current_user, UserRole.EDITOR, with_owner=True
+    )
     
     try:
         updated_event = await crud_event.update_event(
@@ -483,25 +531,10 @@ async def update_event(
             check_conflicts=check_conflicts
         )
         
-        # Get owner info for response
+        # The owner was joined in up front, so this needs no query
         owner = await crud_event.get_owner(db, updated_event)
         
-        # Create response model
-        response_data = {
-            "id": updated_event.id,
-            "title": updated_event.title,
-            "description": updated_event.description,
-            "location": updated_event.location,
-            "start_time": updated_event.start_time,
-            "end_time": updated_event.end_time,
-            "is_recurring": updated_event.is_recurring,
-            "recurrence_pattern": updated_event.recurrence_pattern,
-            "created_by": UserInfo(id=owner.id, email=owner.email),
-            "created_at": updated_event.created_at,
-            "updated_at": updated_event.updated_at
-        }
-        
-        return EventResponse(**response_data)
+        return build_event_response(updated_event, owner)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -556,14 +589,7 @@ async def delete_event(
     
     Requires OWNER role.
     """
-    event = await crud_event.get_event(db, event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    # Check if user has permission to delete
-    has_permission = await crud_event.has_permission(db, event, current_user, "OWNER")
-    if not has_permission:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    event = await _get_authorized_event(db, event_id, current_user, UserRole.OWNER)
     
     await crud_event.delete_event(db, event, current_user, hard_delete=hard_delete)
     return None
@@ -632,11 +658,7 @@ async def share_event(
     
     Requires OWNER role to share the event.
     """
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not db_event.has_permission(current_user, required_role=UserRole.OWNER):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_event = await _get_authorized_event(db, event_id, current_user, UserRole.OWNER)
     
     try:
         permission = await crud_event.create_event_permission(
@@ -696,11 +718,7 @@ async def get_event_permissions(
     
     Returns a list of all permissions if the user has access to the event.
     """
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not db_event.has_permission(current_user):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_event = await _get_authorized_event(db, event_id, current_user)
     
     permissions = await crud_event.get_event_permissions(db, db_event)
     return permissions
@@ -761,11 +779,7 @@ async def update_event_permission(
     
     Requires OWNER role to modify permissions.
     """
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not db_event.has_permission(current_user, required_role=UserRole.OWNER):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_event = await _get_authorized_event(db, event_id, current_user, UserRole.OWNER)
     
     try:
         permission = await crud_event.update_event_permission(
@@ -819,11 +833,7 @@ async def delete_event_permission(
     Requires OWNER role.
     Cannot remove the owner's access.
     """
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not db_event.has_permission(current_user, required_role=UserRole.OWNER):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_event = await _get_authorized_event(db, event_id, current_user, UserRole.OWNER)
     
     try:
         await crud_event.delete_event_permission(db, db_event, user_id, current_user)
@@ -874,19 +884,24 @@ async def get_event_version(
     db: AsyncSession = Depends(get_db),
     event_id: int,
     version_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response
 ):
     """Get a specific version of an event"""
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not db_event.has_permission(current_user):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_event = await _get_authorized_event(db, event_id, current_user)
     
+    # Look the version up first so a missing one is a 404, never a cached 304
     version = await crud_event.get_event_version(db, db_event, version_id)
     if not version:
         raise HTTPException(status_code=404, detail="Version not found")
     
+    # Versions never change, so a client holding this tag can reuse its copy
+    response.headers["ETag"] = f'"{event_id}-{version_id}"'
+    response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    if etag_matches(request, response.headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response.headers)
+    
     return version
 
 @router.get(
@@ -945,23 +960,23 @@ async def get_event_history(
     event_id: int,
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response
 ):
     """Get the version history of an event"""
-    # Get the event
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
+    # Get the event, checking permissions in the same query
+    db_event = await _get_authorized_event(db, event_id, current_user)
     
-    # Check permissions
-    if not db_event.has_permission(current_user):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    # Every change bumps current_version, so it identifies the history state
+    response.headers["ETag"] = f'W/"{event_id}-{db_event.current_version}-{skip}-{limit}"'
+    if etag_matches(request, response.headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response.headers)
     
     # Get all versions
     versions = await crud_event.get_event_versions(db, db_event, skip=skip, limit=limit)
     
-    # Debug log
-    print(f"Endpoint returning {len(versions)} versions for event {event_id}")
+    logger.debug("Returning %d versions for event %d", len(versions), event_id)
     
     # Convert to response model
     return versions
@@ -1022,32 +1037,18 @@ async def rollback_event(
     current_user: User = Depends(get_current_user)
 ):
     """Rollback an event to a specific version"""
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not db_event.has_permission(current_user, required_role=UserRole.EDITOR):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_event = await _get_authorized_event(
+        db, event_id, current_user, UserRole.EDITOR, with_owner=True
+    )
     
     try:
         updated_event = await crud_event.rollback_event(db, db_event, version_id, current_user)
         
-        # Get the owner information for the response
+        # The owner was joined in up front, so this needs no query
         owner = await crud_event.get_owner(db, updated_event)
         
         # Convert to the expected response format
-        return EventResponse(
-            id=updated_event.id,
-            title=updated_event.title,
-            description=updated_event.description,
-            location=updated_event.location,
-            start_time=updated_event.start_time,
-            end_time=updated_event.end_time,
-            is_recurring=updated_event.is_recurring,
-            recurrence_pattern=updated_event.recurrence_pattern,
-            created_by=UserInfo(id=owner.id, email=owner.email),
-            created_at=updated_event.created_at,
-            updated_at=updated_event.updated_at
-        )
+        return build_event_response(updated_event, owner)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -1107,11 +1108,7 @@ async def get_event_diff(
     current_user: User = Depends(get_current_user)
 ) -> EventVersionDiff:
     """Get the difference between two versions of an event"""
-    db_event = await crud_event.get_event(db, event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not db_event.has_permission(current_user):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_event = await _get_authorized_event(db, event_id, current_user)
     
     try:
         diff = await crud_event.get_event_diff(db, db_event, version_id1, version_id2)
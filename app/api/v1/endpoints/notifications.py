@@ -1,5 +1,8 @@
+import hashlib
+import orjson
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, WebSocket, WebSocketDisconnect, Query
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_user
@@ -11,6 +14,13 @@ from app.crud import notification as crud_notification
 from app.api.v1.endpoints.auth import get_current_user_from_token
 from app.core.websocket_limiter import ws_limiter
 from app.core.security import get_current_user_ws
+from app.core.responses import etag_matches
+
+# Acknowledgement sent for every client websocket message, encoded once
+_ACK_MESSAGE = orjson.dumps({"type": "ack", "data": {"received": True}}).decode()
+
+# Validates and serializes a whole notification page in one pass
+_notification_list_adapter = TypeAdapter(List[NotificationResponse])
 
 router = APIRouter(
     prefix="/notifications",
@@ -81,7 +91,8 @@ async def list_notifications(
     skip: int = Query(0, ge=0, description="Number of notifications to skip (pagination)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of notifications to return"),
     unread_only: bool = Query(False, description="Only show unread notifications"),
-    current_user: User = Depends(get_current_user_from_token)
+    current_user: User = Depends(get_current_user_from_token),
+    request: Request
 ) -> List[NotificationResponse]:
     """
     List notifications for the current user.
@@ -92,20 +103,35 @@ async def list_notifications(
     - **unread_only**: Whether to show only unread notifications (default: false)
     
     Returns a paginated list of notifications sorted by creation time (newest first).
+    Honors If-None-Match with 304 Not Modified.
     """
     try:
+        # Any create, read or delete moves the latest update or the count
+        state = await crud_notification.get_notifications_state(db, current_user.id)
+        digest = hashlib.blake2b(
+            f"{state}:{skip}:{limit}:{unread_only}".encode(), digest_size=8
+        ).hexdigest()
+        etag = f'W/"{digest}"'
+        # Clients revalidate on every read; unchanged pages cost a 304
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
         notifications = await crud_notification.get_user_notifications(
             db,
             current_user.id,
-            unread_only=unread_only
+            unread_only=unread_only,
+            skip=skip,
+            limit=limit
         )
         
-        # Apply pagination manually
-        start = skip
-        end = skip + limit
-        paginated_notifications = notifications[start:end]
-        
-        return paginated_notifications
+        # Serialize straight to JSON bytes rather than via jsonable_encoder
+        page = _notification_list_adapter.validate_python(notifications, from_attributes=True)
+        return Response(
+            content=_notification_list_adapter.dump_json(page),
+            media_type="application/json",
+            headers=headers
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -224,7 +250,7 @@ async def mark_all_notifications_read(
     This is a bulk operation that updates all unread notifications.
     """
     try:
-        await crud_notification.mark_all_notifications_read(db, current_user.id)
+        await crud_notification.mark_all_read(db, current_user.id)
         return None
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -272,15 +298,12 @@ async def notifications_websocket(
         
         try:
             while True:
-                # Wait for messages (client pings/status updates)
-                data = await websocket.receive_json()
+                # Wait for messages (client pings/status updates); their
+                # content is not used yet, so skip parsing them
+                await websocket.receive_text()
                 
-                # Handle client messages if needed
                 # For now, we just acknowledge receipt
-                await websocket.send_json({
-                    "type": "ack",
-                    "data": {"received": True}
-                })
+                await websocket.send_text(_ACK_MESSAGE)
                 
         except WebSocketDisconnect:
             await ws_manager.disconnect(websocket, user.id)
@@ -1,13 +1,24 @@
-from typing import Any, Optional, Dict, Callable
+from typing import Any, Optional, Dict, Callable, List, Tuple
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import time
 import asyncio
+import hashlib
+import heapq
 from functools import wraps
 
+import msgpack
+
+from app.core.config import settings
+
 class Cache:
     """Simple in-memory cache implementation"""
-    def __init__(self, default_ttl: int = 300):  # 5 minutes default TTL
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, default_ttl: int = 300, max_size: Optional[int] = None):  # 5 minutes default TTL
+        # key -> (value, expires_at), least recently used first
+        self._cache: OrderedDict[str, Tuple[Any, float]] = OrderedDict()
+        self._max_size = max_size or settings.CACHE_MAX_SIZE
+        # Min-heap of (expires_at, key); stale pairs from overwrites are skipped
+        self._expiry_heap: List[Tuple[float, str]] = []
         self._default_ttl = default_ttl
         self._cleanup_task: Optional[asyncio.Task] = None
 
@@ -15,14 +26,20 @@ class Cache:
         """Periodically cleanup expired cache entries"""
         while True:
             try:
-                current_time = time.time()
-                for key in list(self._cache.keys()):
-                    if self._cache[key]["expires_at"] <= current_time:
-                        del self._cache[key]
+                self._purge_expired(time.time())
                 await asyncio.sleep(60)  # Run cleanup every minute
             except Exception:
                 await asyncio.sleep(60)
 
+    def _purge_expired(self, now: float) -> None:
+        """Drop entries whose expiry has passed, popping only expired heap heads"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self._cache[key]
+
     def start_cleanup(self):
         """Start the cleanup task"""
         if not self._cleanup_task:
@@ -36,29 +53,38 @@ class Cache:
 
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from cache"""
-        if key in self._cache:
-            cache_data = self._cache[key]
-            if cache_data["expires_at"] > time.time():
-                return cache_data["value"]
-            del self._cache[key]
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at > time.time():
+            self._cache.move_to_end(key)
+            return value
+        # pop rather than del: never raises if the entry is already gone
+        self._cache.pop(key, None)
         return None
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set a value in cache with TTL"""
-        expires_at = time.time() + (ttl or self._default_ttl)
-        self._cache[key] = {
-            "value": value,
-            "expires_at": expires_at
-        }
+        now = time.time()
+        expires_at = now + (ttl or self._default_ttl)
+        self._cache[key] = (value, expires_at)
+        self._cache.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        # Evict least recently used entries beyond the size bound
+        while len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+        # Amortized cleanup keeps caches without a cleanup task bounded too
+        self._purge_expired(now)
 
     async def delete(self, key: str) -> None:
         """Delete a value from cache"""
-        if key in self._cache:
-            del self._cache[key]
+        self._cache.pop(key, None)
 
     async def clear(self) -> None:
         """Clear all cache entries"""
         self._cache.clear()
+        self._expiry_heap.clear()
 
 # Global cache instance
 cache = Cache()
@@ -68,8 +94,10 @@ def cached(ttl: Optional[int] = None):
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Create cache key from function name and arguments
-            key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
+            # Hash a compact encoding of the arguments; str() falls back for
+            # values msgpack cannot encode
+            payload = msgpack.packb((args, sorted(kwargs.items())), use_bin_type=True, default=str)
+            key = f"{func.__name__}:{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
             
             # Try to get from cache
             cached_value = await cache.get(key)
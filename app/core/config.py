@@ -20,12 +20,17 @@ class Settings(BaseSettings):
     PORT: int = int(os.environ.get("PORT", 8000))
     
     # Security
-    SECRET_KEY: str = os.environ.get("SECRET_KEY", secrets.token_urlsafe(32))
+    SECRET_KEY: str = os.environ.get("SECRET_KEY") or secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ALGORITHM: str = "HS256"
-    JWT_SECRET_KEY: str = os.environ.get("JWT_SECRET_KEY", secrets.token_urlsafe(32))
+    JWT_SECRET_KEY: str = os.environ.get("JWT_SECRET_KEY") or secrets.token_urlsafe(32)
     JWT_ALGORITHM: str = "HS256"
+    TOKEN_CACHE_TTL_SECONDS: int = 5  # How long a verified token's claims are reused
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # Tune so one hash takes ~250ms on production CPUs; hashes with other costs
+    # are rehashed on next login
+    BCRYPT_ROUNDS: int = 10
     
     # Testing
     TESTING: bool = False
@@ -45,6 +50,7 @@ class Settings(BaseSettings):
     # Rate Limiting
     AUTH_RATE_LIMIT: int = 5  # requests per minute
     API_RATE_LIMIT: int = 100  # requests per minute
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # (ip, path) windows kept in memory
     WS_MAX_CONNECTIONS_PER_USER: int = 5
     WS_MAX_MESSAGES_PER_MINUTE: int = 60
     
@@ -80,6 +86,11 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = os.environ.get("DATABASE_URL", f"sqlite+aiosqlite:///./sqlite_db/app.db")
     SQL_ECHO: bool = False
+    DB_POOL_SIZE: int = 20  # Persistent connections kept in the pool
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed beyond DB_POOL_SIZE
+    DB_POOL_TIMEOUT: int = 5  # Seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is recycled
+    DB_POOL_PRE_PING: bool = True  # Check connections are alive on checkout
     
     # Documentation
     SHOW_DOCS: bool = True
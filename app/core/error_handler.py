@@ -1,26 +1,38 @@
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.core.logging import request_logger
+import orjson
+
+# The unhandled-exception envelope never changes, so serialize it once
+_SERVER_ERROR_BODY = orjson.dumps({
+    "detail": "Internal server error",
+    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+    "type": "server_error"
+})
+
+def _error_response(status_code: int, detail, error_type: str) -> Response:
+    """Serialize an error envelope with orjson."""
+    return Response(
+        orjson.dumps(
+            {"detail": detail, "status_code": status_code, "type": error_type},
+            default=str
+        ),
+        status_code=status_code,
+        media_type="application/json"
+    )
 
 def setup_error_handlers(app: FastAPI) -> None:
     """Configure error handlers for the application."""
     
     @app.exception_handler(StarletteHTTPException)
-    async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
+    async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> Response:
         """Handle HTTP exceptions."""
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={
-                "detail": exc.detail,
-                "status_code": exc.status_code,
-                "type": "http_error"
-            }
-        )
+        return _error_response(exc.status_code, exc.detail, "http_error")
     
     @app.exception_handler(ValueError)
-    async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse:
+    async def value_error_handler(request: Request, exc: ValueError) -> Response:
         """Handle ValueError exceptions."""
         request_logger.error(
             "ValueError occurred",
@@ -31,29 +43,15 @@ def setup_error_handlers(app: FastAPI) -> None:
             },
             exc_info=True
         )
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "detail": str(exc),
-                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
-                "type": "value_error"
-            }
-        )
+        return _error_response(status.HTTP_500_INTERNAL_SERVER_ERROR, str(exc), "value_error")
     
     @app.exception_handler(RequestValidationError)
-    async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+    async def validation_exception_handler(request: Request, exc: RequestValidationError) -> Response:
         """Handle request validation errors."""
-        return JSONResponse(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            content={
-                "detail": exc.errors(),
-                "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
-                "type": "validation_error"
-            }
-        )
+        return _error_response(status.HTTP_422_UNPROCESSABLE_ENTITY, exc.errors(), "validation_error")
     
     @app.exception_handler(Exception)
-    async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    async def general_exception_handler(request: Request, exc: Exception) -> Response:
         """Handle all other exceptions."""
         # Log the error
         request_logger.error(
@@ -66,11 +64,8 @@ def setup_error_handlers(app: FastAPI) -> None:
             exc_info=True
         )
         
-        return JSONResponse(
+        return Response(
+            _SERVER_ERROR_BODY,
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "detail": "Internal server error",
-                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
-                "type": "server_error"
-            }
+            media_type="application/json"
         ) 
\ No newline at end of file
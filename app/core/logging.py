@@ -1,25 +1,47 @@
+import base64
+import itertools
 import logging
-import json
+import os
+import queue
+import sys
 from datetime import datetime, UTC
-from typing import Any, Dict
-from uuid import uuid4
-from pythonjsonlogger.jsonlogger import JsonFormatter
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.config import settings
 import time
-import traceback
 
-class CustomJsonFormatter(JsonFormatter):
-    """Custom JSON formatter for logs."""
+# Attributes every LogRecord carries; anything else was passed via extra=
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+class CustomJsonFormatter(logging.Formatter):
+    """Custom JSON formatter for logs, serialized with orjson."""
+    
+    # (epoch second, "YYYY-MM-DDTHH:MM:SS") for the most recently formatted record
+    _second_cache = (None, "")
+    
+    def _format_timestamp(self, created: float) -> str:
+        """Format an epoch time as ISO 8601 UTC, reusing the per-second prefix."""
+        second = int(created)
+        cached_second, prefix = self._second_cache
+        if cached_second != second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}Z"
     
-    def add_fields(self, log_record: Dict[str, Any], record: logging.LogRecord, message_dict: Dict[str, Any]) -> None:
-        """Add custom fields to the log record."""
-        super().add_fields(log_record, record, message_dict)
+    def format(self, record: logging.LogRecord) -> str:
+        """Render the record and its extra fields as a JSON line."""
+        attrs = record.__dict__
+        log_record: Dict[str, Any] = {
+            key: value for key, value in attrs.items() if key not in _RECORD_ATTRS
+        }
+        log_record["message"] = record.getMessage()
         
-        # Add timestamp in ISO format
-        log_record["timestamp"] = datetime.now(UTC).isoformat()
+        # Add timestamp from the record's creation time
+        log_record["timestamp"] = self._format_timestamp(record.created)
         log_record["level"] = record.levelname
         log_record["name"] = record.name
         
@@ -35,122 +57,243 @@ class CustomJsonFormatter(JsonFormatter):
         # Add environment
         log_record["environment"] = settings.ENVIRONMENT
         
-        # Add request context if available
-        if hasattr(record, "request_id"):
-            log_record["request_id"] = record.request_id
-        if hasattr(record, "user_id"):
-            log_record["user_id"] = record.user_id
-        if hasattr(record, "duration"):
-            log_record["duration"] = record.duration
+        if record.exc_info:
+            log_record["exc_info"] = self.formatException(record.exc_info)
+        
+        return orjson.dumps(log_record, option=orjson.OPT_UTC_Z, default=str).decode()
+
+class BufferedJsonHandler(logging.StreamHandler):
+    """Stream handler that batches formatted records into few large writes."""
+    
+    def __init__(self, stream=None, buffer_size: int = 64 * 1024, flush_interval: float = 0.05):
+        super().__init__(stream)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._last_write = time.monotonic()
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        """Append the formatted record, writing once the buffer is full or stale."""
+        try:
+            line = self.format(record) + self.terminator
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if (
+                self._buffered > self.buffer_size
+                or time.monotonic() - self._last_write >= self.flush_interval
+            ):
+                self.flush()
+        except Exception:
+            self.handleError(record)
+    
+    def _write_buffer(self) -> None:
+        """Write all buffered records in a single call; caller holds the lock."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+        self._last_write = time.monotonic()
+    
+    def flush(self) -> None:
+        """Write out buffered records and flush the stream."""
+        self.acquire()
+        try:
+            if self.stream:
+                self._write_buffer()
+                if hasattr(self.stream, "flush"):
+                    self.stream.flush()
+        finally:
+            self.release()
+
+class BufferedQueueListener(QueueListener):
+    """Queue listener that flushes its handlers whenever the queue goes idle."""
+    
+    def __init__(self, log_queue, *handlers, respect_handler_level: bool = False, flush_interval: float = 0.05):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.flush_interval = flush_interval
+    
+    def _flush_handlers(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+    
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        """Wait for the next record, flushing buffered output while idle."""
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval if block else None)
+            except queue.Empty:
+                if not block:
+                    raise
+                self._flush_handlers()
+    
+    def stop(self) -> None:
+        """Drain the queue, then write out anything still buffered."""
+        super().stop()
+        self._flush_handlers()
+
+class PassthroughQueueHandler(QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as is, keeping exc_info for the JSON formatter."""
+        # The stock prepare() renders the message and traceback on the calling
+        # thread and clears exc_info; the queue never leaves this process
+        return record
+
+# Handler and queue listener installed by setup_logging(), if any
+log_handler: Optional[logging.Handler] = None
+log_listener: Optional[BufferedQueueListener] = None
+
+# Loggers configured by setup_logging() and setup_test_logging()
+_APP_LOGGERS = (
+    "api.request",
+    "api.websocket",
+    "api.auth",
+    "api.events",
+    "api.notifications",
+    "db",
+    "cache",
+    "httpx",
+    "uvicorn"
+)
+
+# Formatters hold no per-record state, so every handler shares this one
+_json_formatter = CustomJsonFormatter()
+
+def _configure_loggers(handler: logging.Handler, level) -> None:
+    """Attach the handler to the root logger and set levels on the app loggers."""
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.addHandler(handler)
+    
+    # Records reach the root handler by propagation, so each is handled once
+    for logger_name in _APP_LOGGERS:
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(level)
+        logger.handlers.clear()
+        logger.propagate = True
+
+def _log_destination() -> logging.Handler:
+    """Pick stdout in development, else a rotating log file if one can be opened."""
+    if settings.ENVIRONMENT.lower() != "development":
+        try:
+            return RotatingFileHandler(filename="app.log", maxBytes=10_000_000, backupCount=3)
+        except (PermissionError, FileNotFoundError):
+            # Fall back to stdout where the filesystem is read-only (e.g. Railway)
+            pass
+    return BufferedJsonHandler(sys.stdout)
 
 def setup_logging() -> None:
     """Configure logging for the application."""
-    # Create handlers
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(CustomJsonFormatter())
+    global log_handler, log_listener
     
-    # Configure root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(settings.LOG_LEVEL)
-    root_logger.addHandler(console_handler)
-    
-    # Configure specific loggers
-    loggers = [
-        "api.request",
-        "api.websocket",
-        "api.auth",
-        "api.events",
-        "api.notifications",
-        "db",
-        "cache",
-        "httpx",
-        "uvicorn"
-    ]
-    
-    for logger_name in loggers:
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(settings.LOG_LEVEL)
-        logger.propagate = False
-        logger.addHandler(console_handler)
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    if log_listener is not None:
+        log_listener.stop()
+    
+    # Format and write records on a listener thread; loggers only enqueue them
+    log_handler = _log_destination()
+    log_handler.setFormatter(_json_formatter)
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    log_listener = BufferedQueueListener(log_queue, log_handler, respect_handler_level=True)
+    log_listener.start()
+    
+    _configure_loggers(PassthroughQueueHandler(log_queue), settings.LOG_LEVEL.upper())
+
+def stop_logging() -> None:
+    """Write out every queued and buffered record; call once at shutdown."""
+    global log_listener
+    if log_listener is None:
+        return
+    log_listener.stop()
+    log_listener = None
+    
+    # Later records go straight to the handler instead of an unread queue
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, PassthroughQueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(log_handler)
 
 def setup_test_logging() -> None:
     """Configure logging for tests with propagation enabled."""
-    # Create handlers
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(CustomJsonFormatter())
+    console_handler.setFormatter(_json_formatter)
     
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(console_handler)
-    
-    # Configure specific loggers with propagation enabled for tests
-    loggers = [
-        "api.request",
-        "api.websocket",
-        "api.auth",
-        "api.events",
-        "api.notifications",
-        "db",
-        "cache",
-        "httpx",
-        "uvicorn"
-    ]
-    
-    for logger_name in loggers:
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(logging.INFO)
-        logger.propagate = True  # Enable propagation for test capture
-        logger.addHandler(console_handler)
+    _configure_loggers(console_handler, logging.INFO)
+
+def _request_id_prefix() -> str:
+    """Build the per-process request ID prefix from the PID and start time."""
+    raw = os.getpid().to_bytes(4, "big") + int(time.time()).to_bytes(4, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+_request_id_prefix_value = _request_id_prefix()
+_request_counter = itertools.count()
+
+def _reset_request_ids() -> None:
+    """Give forked workers their own request ID sequence."""
+    global _request_id_prefix_value, _request_counter
+    _request_id_prefix_value = _request_id_prefix()
+    _request_counter = itertools.count()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_request_ids)
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging HTTP requests."""
+def next_request_id() -> str:
+    """Return a request ID unique within this process."""
+    return f"{_request_id_prefix_value}-{next(_request_counter):x}"
+
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware for logging HTTP requests."""
+    
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # Health checks, scrapes and docs bypass this middleware entirely
+        self._skip_paths = frozenset(settings.VALIDATION_EXEMPT_PATHS)
     
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and log details."""
-        request_id = str(uuid4())
-        start_time = time.time()
+        if scope["type"] != "http" or scope["path"] in self._skip_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = next_request_id()
+        start_time = time.perf_counter()
         
         # Add request ID to request state
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
         
         # Log request details
         extra = {
             "request_id": request_id,
             "user_id": None,  # Will be set by auth middleware if user is authenticated
-            "method": request.method,
-            "path": request.url.path,
+            "method": scope["method"],
+            "path": scope["path"],
             "timestamp": datetime.now(UTC).isoformat(),
             "duration": None
         }
         
         request_logger.info("Incoming request", extra=extra)
         
-        try:
-            response = await call_next(request)
-            
-            # Update duration in extra fields
-            duration = time.time() - start_time
-            extra["duration"] = duration
-            extra["status_code"] = response.status_code
-            
-            request_logger.info("Request completed", extra=extra)
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            
-            return response
-            
-        except Exception as e:
-            # Log error with traceback
-            duration = time.time() - start_time
-            extra["duration"] = duration
-            extra["error"] = str(e)
-            extra["error_type"] = e.__class__.__name__
-            extra["exc_info"] = traceback.format_exc()
-            
-            request_logger.error(f"{e.__class__.__name__} occurred", extra=extra)
-            raise
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Update duration in extra fields
+                extra["duration"] = time.perf_counter() - start_time
+                extra["status_code"] = message["status"]
+                
+                request_logger.info("Request completed", extra=extra)
+                
+                # Add request ID to response headers
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+        
+        # Unhandled exceptions are logged by the application's error handlers
+        await self.app(scope, receive, send_wrapper)
 
 # Create specific loggers
 request_logger = logging.getLogger("api.request")
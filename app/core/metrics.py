@@ -1,8 +1,8 @@
 from prometheus_client import Counter, Histogram, Gauge, Info, REGISTRY
 from prometheus_client.openmetrics.exposition import generate_latest
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Dict, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Any, Dict, Optional, Tuple
 import time
 from app.core.config import settings
 
@@ -108,52 +108,72 @@ RATE_LIMIT_HITS_TOTAL = Counter(
     ['path']
 )
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware for collecting request metrics."""
+class MetricsMiddleware:
+    """Pure ASGI middleware for collecting request metrics."""
     
-    async def dispatch(self, request: Request, call_next) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # Health checks, scrapes and docs bypass this middleware entirely
+        self._skip_paths = frozenset(settings.VALIDATION_EXEMPT_PATHS)
+        # Label children resolved once per (method, path) and (method, path, status)
+        self._route_children: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+        self._total_children: Dict[Tuple[str, str, int], Any] = {}
+    
+    def _children_for(self, method: str, path: str) -> Tuple[Any, Any]:
+        """Return the in-progress and duration children for a route."""
+        key = (method, path)
+        children = self._route_children.get(key)
+        if children is None:
+            children = self._route_children[key] = (
+                HTTP_REQUESTS_IN_PROGRESS.labels(method=method, path=path),
+                HTTP_REQUEST_DURATION.labels(method=method, path=path),
+            )
+        return children
+    
+    def _total_for(self, method: str, path: str, status: int) -> Any:
+        """Return the request counter child for a route and status."""
+        key = (method, path, status)
+        child = self._total_children.get(key)
+        if child is None:
+            # The status label string is only built the first time it is seen
+            child = self._total_children[key] = HTTP_REQUESTS_TOTAL.labels(
+                method=method, path=path, status=str(status)
+            )
+        return child
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and collect metrics."""
-        start_time = time.time()
+        if scope["type"] != "http" or scope["path"] in self._skip_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        path = scope["path"]
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        in_progress, duration_histogram = self._children_for(method, path)
         
         # Track in-progress requests
-        HTTP_REQUESTS_IN_PROGRESS.labels(
-            method=request.method,
-            path=request.url.path
-        ).inc()
+        in_progress.inc()
         
         try:
-            response = await call_next(request)
-            status_code = str(response.status_code)
-            
-            # Record request duration
-            duration = time.time() - start_time
-            HTTP_REQUEST_DURATION.labels(
-                method=request.method,
-                path=request.url.path
-            ).observe(duration)
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Record request duration, including requests that raised
+            duration_histogram.observe(time.perf_counter() - start_time)
             
-            # Record request count
-            HTTP_REQUESTS_TOTAL.labels(
-                method=request.method,
-                path=request.url.path,
-                status=status_code
-            ).inc()
+            # Record request count; errors before a response count as 500
+            self._total_for(method, path, status_code).inc()
             
-            return response
-        except Exception as e:
-            # Record error metrics
-            HTTP_REQUESTS_TOTAL.labels(
-                method=request.method,
-                path=request.url.path,
-                status="500"
-            ).inc()
-            raise e
-        finally:
             # Always decrement in-progress requests
-            HTTP_REQUESTS_IN_PROGRESS.labels(
-                method=request.method,
-                path=request.url.path
-            ).dec()
+            in_progress.dec()
 
 async def metrics_endpoint():
     """Endpoint for exposing Prometheus metrics."""
@@ -163,19 +183,31 @@ async def metrics_endpoint():
     )
 
 # Helper functions for recording metrics
+# Label children already resolved by the record_* helpers, keyed by metric and values
+_label_children: Dict[Tuple[Any, Tuple[Any, ...]], Any] = {}
+
+def _child(metric, *label_values):
+    """Return the metric's child for these label values, resolving it only once."""
+    key = (metric, label_values)
+    child = _label_children.get(key)
+    if child is None:
+        # labels() stringifies each value, so bools become "True"/"False" here
+        child = _label_children[key] = metric.labels(*label_values)
+    return child
+
 def record_db_operation(operation: str, duration: float) -> None:
     """Record database operation metrics."""
-    DB_QUERIES_TOTAL.labels(operation=operation).inc()
-    db_query_duration_seconds.labels(operation=operation).observe(duration)
+    _child(DB_QUERIES_TOTAL, operation).inc()
+    _child(db_query_duration_seconds, operation).observe(duration)
 
 def record_cache_operation(operation: str, hit: bool) -> None:
     """Record cache operation metrics."""
-    cache_operations_total.labels(operation=operation).inc()
-    CACHE_HITS_TOTAL.labels(operation=operation, hit=str(hit)).inc()
+    _child(cache_operations_total, operation).inc()
+    _child(CACHE_HITS_TOTAL, operation, hit).inc()
 
 def record_auth_attempt(success: bool, method: str) -> None:
     """Record authentication attempt metrics."""
-    AUTH_SUCCESSES_TOTAL.labels(method=method, success=str(success)).inc()
+    _child(AUTH_SUCCESSES_TOTAL, method, success).inc()
 
 def record_ws_event(path: str, event: str) -> None:
     """Record WebSocket event metrics."""
@@ -1,14 +1,15 @@
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.types import ASGIApp
+import ipaddress
+from typing import Optional
+from fastapi import Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.config import settings
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """Add security headers to responses."""
     
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+        self.app = app
         self.security_headers = {
             "X-Frame-Options": "DENY",
             "X-Content-Type-Options": "nosniff",
@@ -17,50 +18,98 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             "Content-Security-Policy": f"report-uri {settings.CSP_REPORT_URI}" if settings.CSP_REPORT_URI else None,
             "Referrer-Policy": "strict-origin-when-cross-origin"
         }
+        # The headers are constant, so encode them once for every response
+        self._raw_headers = tuple([
+            (header_name.lower().encode("latin-1"), header_value.encode("latin-1"))
+            for header_name, header_value in self.security_headers.items()
+            if header_value
+        ])
+        self._header_names = {header_name for header_name, _ in self._raw_headers}
     
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        response = await call_next(request)
-        for header_name, header_value in self.security_headers.items():
-            if header_value:
-                response.headers[header_name] = header_value
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Replace any values set downstream rather than duplicating them
+                headers = [
+                    header for header in message.get("headers", ())
+                    if header[0] not in self._header_names
+                ]
+                headers.extend(self._raw_headers)
+                message["headers"] = headers
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+class RequestValidationMiddleware:
     """Validate incoming requests."""
     
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
-        self.blocked_paths = settings.BLOCKED_PATHS
-        self.blocked_ips = settings.BLOCKED_IPS
-        self.validation_exempt_paths = settings.VALIDATION_EXEMPT_PATHS
+        self.app = app
+        # str.startswith takes a tuple, checking every prefix in one C call
+        self.blocked_paths = tuple(settings.BLOCKED_PATHS)
+        # Plain addresses are matched by set lookup; CIDR entries by network
+        self.blocked_ips = frozenset(ip for ip in settings.BLOCKED_IPS if "/" not in ip)
+        self.blocked_networks = tuple(
+            ipaddress.ip_network(ip, strict=False)
+            for ip in settings.BLOCKED_IPS if "/" in ip
+        )
+        self.validation_exempt_paths = frozenset(settings.VALIDATION_EXEMPT_PATHS)
         self.max_content_length = settings.MAX_CONTENT_LENGTH
     
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response = self._reject(scope)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        
+        await self.app(scope, receive, send)
+    
+    def _reject(self, scope: Scope) -> Optional[Response]:
+        """Return the error response for a request that fails validation, if any."""
         # Check blocked paths
-        if any(request.url.path.startswith(path) for path in self.blocked_paths):
+        if scope["path"].startswith(self.blocked_paths):
             return Response(status_code=403, content="Access denied")
         
         # Check blocked IPs
-        client_ip = request.client.host if request.client else None
-        if client_ip and client_ip in self.blocked_ips:
+        client = scope.get("client")
+        client_ip = client[0] if client else None
+        if client_ip and (client_ip in self.blocked_ips or self._in_blocked_network(client_ip)):
             return Response(status_code=403, content="IP blocked")
         
         # Check content length
-        content_length = request.headers.get("content-length")
+        content_length = Headers(scope=scope).get("content-length")
         if content_length and int(content_length) > self.max_content_length:
             return Response(status_code=413, content="Request too large")
         
-        return await call_next(request)
+        return None
+    
+    def _in_blocked_network(self, client_ip: str) -> bool:
+        """Check the client address against the blocked CIDR ranges."""
+        if not self.blocked_networks:
+            return False
+        try:
+            address = ipaddress.ip_address(client_ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.blocked_networks)
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """Rate limit requests."""
     
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+        self.app = app
         self.auth_rate_limit = settings.AUTH_RATE_LIMIT
         self.api_rate_limit = settings.API_RATE_LIMIT
     
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Implement rate limiting logic here
         # For now, just pass through
-        return await call_next(request) 
\ No newline at end of file
+        await self.app(scope, receive, send)
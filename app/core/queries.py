@@ -1,6 +1,16 @@
-from datetime import datetime, timedelta
-from typing import Optional
-from pydantic import BaseModel, Field, model_validator
+from datetime import datetime, timedelta, UTC
+from typing import Annotated, Optional
+from pydantic import AfterValidator, BaseModel, Field, model_validator
+
+def _ensure_utc(dt: datetime) -> datetime:
+    """Treat naive datetimes as UTC"""
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
+
+# Parsed by pydantic's core datetime parser, then made timezone-aware
+UTCDateTime = Annotated[datetime, AfterValidator(_ensure_utc)]
+
+# Longest date range a query may span
+_MAX_DATE_RANGE = timedelta(days=365)
 
 class DateRangeQuery(BaseModel):
     """Schema for date range queries"""
@@ -13,7 +23,7 @@ class DateRangeQuery(BaseModel):
     def validate_date_range(self):
         if self.end_date <= self.start_date:
             raise ValueError("end_date must be after start_date")
-        if self.end_date - self.start_date > timedelta(days=365):
+        if self.end_date - self.start_date > _MAX_DATE_RANGE:
             raise ValueError("Date range cannot exceed 1 year")
         return self
 
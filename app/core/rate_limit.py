@@ -1,44 +1,22 @@
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
+import sys
 import time
 from typing import Optional, Dict, Tuple
-import asyncio
+from collections import OrderedDict
 from datetime import datetime
+from app.core.config import settings
+
+# Matches the unversioned auth path only; the mounted /api/v1/auth/ routes get
+# the regular limit until the client IP is taken from the proxy headers
+AUTH_PATH_PREFIX = sys.intern("/api/auth/")
 
 class RateLimiter:
     """In-memory rate limiter implementation"""
-    def __init__(self):
-        self.requests: Dict[Tuple[str, str], list] = {}  # (ip, path) -> [timestamps]
-        self._cleanup_task: Optional[asyncio.Task] = None
-
-    async def _cleanup_old_requests(self):
-        """Periodically cleanup old request records"""
-        while True:
-            try:
-                current_time = time.time()
-                for key in list(self.requests.keys()):
-                    # Remove timestamps older than 1 minute
-                    self.requests[key] = [
-                        ts for ts in self.requests[key]
-                        if current_time - ts < 60
-                    ]
-                    # Remove empty lists
-                    if not self.requests[key]:
-                        del self.requests[key]
-                await asyncio.sleep(60)  # Run cleanup every minute
-            except Exception:
-                await asyncio.sleep(60)  # Continue even if there's an error
-
-    def start_cleanup(self):
-        """Start the cleanup task"""
-        if not self._cleanup_task:
-            self._cleanup_task = asyncio.create_task(self._cleanup_old_requests())
-
-    def stop_cleanup(self):
-        """Stop the cleanup task"""
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            self._cleanup_task = None
+    def __init__(self, max_keys: Optional[int] = None):
+        # (ip, path) -> (window, count), least recently used first
+        self.requests: "OrderedDict[Tuple[str, str], Tuple[int, int]]" = OrderedDict()
+        self._max_keys = max_keys or settings.RATE_LIMIT_MAX_KEYS
 
     async def is_rate_limited(
         self,
@@ -53,19 +31,20 @@ class RateLimiter:
         key = (client_ip, path)
 
         # Use stricter limit for auth endpoints
-        current_limit = auth_limit if path.startswith("/api/auth/") else limit
+        current_limit = auth_limit if path.startswith(AUTH_PATH_PREFIX) else limit
 
-        # Initialize or update request timestamps
-        if key not in self.requests:
-            self.requests[key] = []
-        self.requests[key].append(current_time)
+        # Count requests in the current one-minute window
+        window = int(current_time) // 60
+        entry = self.requests.get(key)
+        count = entry[1] + 1 if entry is not None and entry[0] == window else 1
+        self.requests[key] = (window, count)
+        self.requests.move_to_end(key)
 
-        # Count requests in the last minute
-        minute_ago = current_time - 60
-        recent_requests = [ts for ts in self.requests[key] if ts > minute_ago]
-        self.requests[key] = recent_requests
+        # Stale windows reset on access, so evicting the LRU key bounds memory
+        if len(self.requests) > self._max_keys:
+            self.requests.popitem(last=False)
 
-        return len(recent_requests) > current_limit
+        return count > current_limit
 
 # Global rate limiter instance
 limiter = RateLimiter()
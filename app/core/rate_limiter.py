@@ -7,11 +7,22 @@ from redis.asyncio import Redis
 from app.core.config import settings
 from app.core.metrics import record_rate_limit_hit
 
+# Increment the window counter and set its expiry in one round trip
+_INCR_WINDOW_LUA = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+
 class RateLimiter:
     """Rate limiter using Redis."""
     
     def __init__(self, redis: Redis):
         self.redis = redis
+        # Runs via EVALSHA, reloading the script if Redis has flushed it
+        self._incr_window = redis.register_script(_INCR_WINDOW_LUA)
         self.default_rate = settings.API_RATE_LIMIT
         self.auth_rate = settings.AUTH_RATE_LIMIT
         self.window = 60  # 1 minute window
@@ -27,42 +38,31 @@ class RateLimiter:
         limit: Optional[int] = None
     ) -> Tuple[bool, Dict[str, int]]:
         """Check if request should be rate limited."""
-        key = await self._get_key(identifier, endpoint)
         now = int(time.time())
-        window_start = now - self.window
+        window = now // self.window
+        key = f"{await self._get_key(identifier, endpoint)}:{window}"
+        rate_limit = limit or self.default_rate
+        reset_time = (window + 1) * self.window
         
-        async with self.redis.pipeline(transaction=True) as pipe:
-            try:
-                # Clean old records
-                await pipe.zremrangebyscore(key, 0, window_start)
-                # Count requests in current window
-                await pipe.zcard(key)
-                # Add current request
-                await pipe.zadd(key, {str(now): now})
-                # Set expiry
-                await pipe.expire(key, self.window)
-                # Execute pipeline
-                _, current_requests, _, _ = await pipe.execute()
-                
-                rate_limit = limit or self.default_rate
-                is_limited = current_requests >= rate_limit
-                
-                remaining = max(0, rate_limit - current_requests)
-                reset_time = now + self.window
-                
-                return is_limited, {
-                    "limit": rate_limit,
-                    "remaining": remaining,
-                    "reset": reset_time
-                }
-                
-            except Exception as e:
-                # If Redis fails, allow request but log error
-                return False, {
-                    "limit": rate_limit,
-                    "remaining": -1,
-                    "reset": now + self.window
-                }
+        try:
+            current_requests = await self._incr_window(keys=[key], args=[self.window])
+            
+            is_limited = current_requests > rate_limit
+            remaining = max(0, rate_limit - current_requests)
+            
+            return is_limited, {
+                "limit": rate_limit,
+                "remaining": remaining,
+                "reset": reset_time
+            }
+            
+        except Exception as e:
+            # If Redis fails, allow request but log error
+            return False, {
+                "limit": rate_limit,
+                "remaining": -1,
+                "reset": reset_time
+            }
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Middleware for rate limiting requests."""
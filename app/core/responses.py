@@ -1,9 +1,17 @@
 from typing import Any
-from fastapi import Response
+from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 import msgpack
+import orjson
 from app.core.cache import cached
 
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match covers the given ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
 class MessagePackResponse(Response):
     """Response class for MessagePack serialization"""
     media_type = "application/x-msgpack"
@@ -11,6 +19,11 @@ class MessagePackResponse(Response):
     def render(self, content: Any) -> bytes:
         return msgpack.packb(content)
 
+class ORJSONResponse(JSONResponse):
+    """JSON response class serialized with orjson"""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
 class DynamicResponse(Response):
     """Dynamic response class that can return either JSON or MessagePack based on Accept header"""
     def __init__(self, content: Any, *args, **kwargs):
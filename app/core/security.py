@@ -1,17 +1,40 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta, UTC
 from typing import Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+import bcrypt
 from passlib.context import CryptContext
 from jose import jwt, JWTError
-from fastapi import Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi import Depends, HTTPException, Request, Response, status, WebSocket, WebSocketDisconnect
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.db.database import get_db
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Passlib has no argon2 backend installed here; adding "argon2" ahead of
+# "bcrypt" (with argon2-cffi) would migrate users the same way rounds do.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Bounded pool for bcrypt work so hashing never blocks the event loop. bcrypt
+# releases the GIL, so one worker per usable CPU runs jobs truly in parallel.
+_password_pool = ThreadPoolExecutor(
+    max_workers=len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1),
+    thread_name_prefix="bcrypt"
+)
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -39,21 +62,79 @@ def create_refresh_token(data: dict[str, Any]) -> str:
     )
     return encoded_jwt
 
+def _b64url(raw: bytes) -> bytes:
+    """Unpadded base64url encoding as used by JWS"""
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+# Encoded once; every HS256 token we issue carries the same header
+_HS256_HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+
+def _sign_hs256(claims: dict[str, Any], key: bytes) -> str:
+    """Sign claims as a compact HS256 JWT against the precomputed header"""
+    payload = _b64url(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = _HS256_HEADER_B64 + b"." + payload
+    signature = _b64url(hmac.new(key, signing_input, hashlib.sha256).digest())
+    return (signing_input + b"." + signature).decode()
+
+def _create_token_pair_fast(data: dict[str, Any]) -> Tuple[str, str]:
+    """Issue an HS256 access/refresh pair sharing one claims build and key"""
+    now = datetime.now(UTC)
+    key = settings.JWT_SECRET_KEY.encode()
+    access_claims = {
+        **data,
+        "exp": int((now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)).timestamp()),
+        "type": "access"
+    }
+    refresh_claims = {
+        **data,
+        "exp": int((now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)).timestamp()),
+        "type": "refresh"
+    }
+    return _sign_hs256(access_claims, key), _sign_hs256(refresh_claims, key)
+
 def create_token_pair(data: dict[str, Any]) -> Tuple[str, str]:
     """Create both access and refresh tokens"""
+    if settings.JWT_ALGORITHM == "HS256":
+        return _create_token_pair_fast(data)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(data, expires_delta=access_token_expires)
     refresh_token = create_refresh_token(data)
     return access_token, refresh_token
 
+# Recently verified tokens: sha256(token) -> (claims, expires_at), least recently used first
+_token_cache: "OrderedDict[bytes, Tuple[dict[str, Any], float]]" = OrderedDict()
+
+def _decode_token(token: str) -> dict[str, Any]:
+    """Decode a JWT, reusing claims verified within the last few seconds"""
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+    entry = _token_cache.get(key)
+    if entry is not None:
+        payload, expires_at = entry
+        if expires_at > now:
+            _token_cache.move_to_end(key)
+            return payload
+        del _token_cache[key]
+    
+    payload = jwt.decode(
+        token,
+        settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM]
+    )
+    # Never keep claims past the token's own expiry
+    expires_at = now + settings.TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    _token_cache[key] = (payload, expires_at)
+    if len(_token_cache) > settings.TOKEN_CACHE_MAX_SIZE:
+        _token_cache.popitem(last=False)
+    return payload
+
 def verify_token(token: str, token_type: str = "access") -> dict[str, Any]:
     """Verify and decode a JWT token"""
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = _decode_token(token)
         if payload.get("type") != token_type:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,15 +149,42 @@ def verify_token(token: str, token_type: str = "access") -> dict[str, Any]:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
+    """Verify directly with bcrypt, truncating to 72 bytes as passlib does"""
+    try:
+        return bcrypt.checkpw(plain_password.encode()[:72], hashed_password.encode())
+    except ValueError:
+        return False
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
+    if hashed_password.startswith("$2"):
+        return _checkpw(plain_password, hashed_password)
+    # Hashes in any other scheme go through passlib
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    """Hash a password with bcrypt at the configured cost"""
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode()[:72], salt).decode()
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash predates the current hashing policy"""
+    return pwd_context.needs_update(hashed_password)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash on the bcrypt thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_pool, verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password on the bcrypt thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_pool, get_password_hash, password)
 
 async def get_current_user(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ):
@@ -114,6 +222,13 @@ async def get_current_user(
             detail="Inactive user"
         )
     
+    # Keep authenticated reads out of shared caches and have the client revalidate
+    # them, so its own edits show up at once; ETag endpoints answer with a 304.
+    # Immutable resources override this with a max-age.
+    if request.method == "GET":
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.headers["Vary"] = "Authorization"
+    
     return user
 
 async def get_current_user_ws(
@@ -1,11 +1,10 @@
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-import secrets
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from types import MappingProxyType
 from typing import Optional
 from app.core.config import settings
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+class SecurityMiddleware:
     def __init__(
         self,
         app: ASGIApp,
@@ -13,34 +12,12 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         csp_policy: Optional[str] = None,
         hsts_max_age: int = 31536000
     ):
-        super().__init__(app)
+        self.app = app
         self.csp_policy = csp_policy or self._default_csp_policy()
         self.hsts_max_age = hsts_max_age
-
-    def _default_csp_policy(self) -> str:
-        """Generate default Content Security Policy."""
-        return (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data: https:; "
-            "font-src 'self' data: https:; "
-            "connect-src 'self' ws: wss:; "
-            f"frame-ancestors {settings.ALLOWED_HOSTS}; "
-            "base-uri 'self'; "
-            "form-action 'self'"
-        )
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        """Add security headers to response."""
-        # Generate nonce for CSP
-        nonce = secrets.token_urlsafe(16)
-        
-        # Call next middleware/route handler
-        response = await call_next(request)
         
-        # Security Headers
-        headers = {
+        # Security Headers, identical for every response
+        self._static_headers = MappingProxyType({
             # Content Security Policy
             "Content-Security-Policy": self.csp_policy,
             
@@ -73,13 +50,46 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             
             # Clear-Site-Data on logout (handled separately in auth endpoints)
             # "Clear-Site-Data": "\"cache\", \"cookies\", \"storage\"",
-        }
+        })
+        self._raw_headers = tuple(
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in self._static_headers.items()
+        )
+        self._header_names = frozenset(name for name, _ in self._raw_headers)
+
+    def _default_csp_policy(self) -> str:
+        """Generate default Content Security Policy."""
+        return (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+            "style-src 'self' 'unsafe-inline'; "
+            "img-src 'self' data: https:; "
+            "font-src 'self' data: https:; "
+            "connect-src 'self' ws: wss:; "
+            f"frame-ancestors {settings.ALLOWED_HOSTS}; "
+            "base-uri 'self'; "
+            "form-action 'self'"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Add security headers to response."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Add headers to response
-        for header_name, header_value in headers.items():
-            response.headers[header_name] = header_value
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add headers to response, replacing any set downstream
+                headers = [
+                    header for header in message.get("headers", ())
+                    if header[0] not in self._header_names
+                ]
+                headers.extend(self._raw_headers)
+                message["headers"] = headers
+            await send(message)
         
-        return response
+        # Call next middleware/route handler
+        await self.app(scope, receive, send_wrapper)
 
 def setup_security_middleware(app: FastAPI) -> None:
     """Configure security middleware for the application."""
@@ -1,12 +1,68 @@
-from fastapi import FastAPI, Request, Response, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import re
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Optional
 from app.core.config import settings
 from urllib.parse import unquote
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+# Fragments that need no punctuation to match, shared by both patterns below
+_SQL_KEYWORDS = r"\bSELECT\b|\bINSERT\b|\bUPDATE\b|\bDELETE\b|\bDROP\b|\bUNION\b|\bALTER\b|\bEXEC\b|\bOR\s+1\s*=\s*1\b|\bOR\s+'[^']+'='[^']+'\b"
+_XSS_HANDLERS = r"onload=|onerror="
+
+# Common attack patterns, fused into one alternation so each string is scanned once.
+# No branch has a ".*" gap between tokens, which is what lets backtracking go
+# quadratic on long inputs; keep it that way when adding patterns.
+_ATTACK_PATTERN = re.compile(
+    rf"(?P<sql_injection>{_SQL_KEYWORDS}|--\s+)"
+    rf"|(?P<xss><script|javascript:|data:text/html|vbscript:|{_XSS_HANDLERS}|<iframe)"
+    r"|(?P<path_traversal>\.{2}[/\\])"
+    r"|(?P<command_injection>[;&|`]|\$\(|\|\||&&)",
+    re.IGNORECASE
+)
+
+# Every other branch of _ATTACK_PATTERN needs one of these substrings, so
+# without them only the keyword pattern can match. JWTs contain "." but never
+# "..", which keeps authenticated requests on the fast path.
+_SUSPICIOUS_NEEDLES = ("<", ":", ";", "&", "|", "`", "$(", "..", "--")
+_KEYWORD_PATTERN = re.compile(
+    rf"(?P<sql_injection>{_SQL_KEYWORDS})|(?P<xss>{_XSS_HANDLERS})",
+    re.IGNORECASE
+)
+
+_ATTACK_MESSAGES = {
+    "sql_injection": "Potential SQL injection detected",
+    "xss": "Potential XSS attack detected",
+    "path_traversal": "Path traversal attempt detected",
+    "command_injection": "Command injection attempt detected"
+}
+
+# Header values worth scanning; the rest cause too many false positives
+_SENSITIVE_HEADERS = ("cookie", "authorization")
+
+# Security headers added to every validated response, encoded once
+_SECURITY_HEADERS = tuple(
+    (name.encode("latin-1"), value.encode("latin-1"))
+    for name, value in (
+        ("content-security-policy", (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline'; "
+            "style-src 'self' 'unsafe-inline'; "
+            "img-src 'self' data:; "
+            "font-src 'self'; "
+            "connect-src 'self'"
+        )),
+        ("x-content-type-options", "nosniff"),
+        ("x-frame-options", "DENY"),
+        ("x-xss-protection", "1; mode=block"),
+        ("strict-transport-security", "max-age=31536000; includeSubDomains"),
+        ("referrer-policy", "strict-origin-when-cross-origin")
+    )
+)
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in _SECURITY_HEADERS)
+
+class RequestValidationMiddleware:
     def __init__(
         self,
         app: ASGIApp,
@@ -15,26 +71,15 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
         blocked_paths: Optional[List[str]] = None,
         blocked_ips: Optional[List[str]] = None
     ):
-        super().__init__(app)
+        self.app = app
         self.max_content_length = max_content_length
         self.blocked_paths = blocked_paths or []
         self.blocked_ips = blocked_ips or []
-        
-        # Common attack patterns
-        self.sql_injection_pattern = re.compile(
-            r"(?i)((\bSELECT\b|\bINSERT\b|\bUPDATE\b|\bDELETE\b|\bDROP\b|\bUNION\b|\bALTER\b|\bEXEC\b|\bOR\s+1\s*=\s*1\b|\bOR\s+'[^']+'='[^']+'\b|--\s+))"
-        )
-        self.xss_pattern = re.compile(
-            r"(?i)(<script|javascript:|data:text/html|vbscript:|onload=|onerror=|<img[^>]*src=.*onerror=|<iframe)"
-        )
-        self.path_traversal_pattern = re.compile(r"\.{2}[/\\]")
-        self.command_injection_pattern = re.compile(
-            r"(?i)([;&|`]|\$\(|\|\||&&)"
-        )
+        self.validation_exempt_paths = frozenset(settings.VALIDATION_EXEMPT_PATHS)
 
-    def _check_content_length(self, request: Request) -> None:
+    def _check_content_length(self, headers: Headers) -> None:
         """Check if request content length is within limits."""
-        content_length = request.headers.get("content-length")
+        content_length = headers.get("content-length")
         if content_length and int(content_length) > self.max_content_length:
             raise HTTPException(
                 status_code=413,
@@ -44,9 +89,8 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
                 }
             )
 
-    def _check_blocked_path(self, request: Request) -> None:
+    def _check_blocked_path(self, path: str) -> None:
         """Check if request path is blocked."""
-        path = request.url.path
         if any(blocked in path for blocked in self.blocked_paths):
             raise HTTPException(
                 status_code=403,
@@ -56,12 +100,13 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
                 }
             )
 
-    def _check_blocked_ip(self, request: Request) -> None:
+    def _check_blocked_ip(self, scope: Scope, headers: Headers) -> None:
         """Check if request IP is blocked."""
-        client_ip = request.client.host if request.client else None
+        client = scope.get("client")
+        client_ip = client[0] if client else None
         
         # Check X-Forwarded-For header for proxy situations
-        forwarded_for = request.headers.get("X-Forwarded-For")
+        forwarded_for = headers.get("x-forwarded-for")
         if forwarded_for:
             # The first IP in the list is the original client
             proxied_ip = forwarded_for.split(",")[0].strip()
@@ -83,132 +128,84 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
                 }
             )
 
-    def _check_attack_patterns(self, request: Request) -> None:
+    def _check_attack_patterns(self, path: str, raw_query: str, headers: Headers) -> None:
         """Check request for common attack patterns."""
-        # Get request data
-        path = request.url.path
+        # Join everything into one buffer; NUL never matches, so no hit spans two parts
+        data_to_check = "\x00".join([
+            path,
+            str(QueryParams(raw_query)),
+            unquote(raw_query),  # Check the raw decoded query string
+            *(headers.get(name, "") for name in _SENSITIVE_HEADERS)
+        ])
         
-        # Get raw query string and URL-decode it
-        raw_query = str(request.url.query)
-        decoded_query = unquote(raw_query)
+        # Most requests carry none of the punctuation the other branches need
+        if any(needle in data_to_check for needle in _SUSPICIOUS_NEEDLES):
+            match = _ATTACK_PATTERN.search(data_to_check)
+        else:
+            match = _KEYWORD_PATTERN.search(data_to_check)
+        if match:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "code": "INVALID_REQUEST",
+                    "message": _ATTACK_MESSAGES[match.lastgroup]
+                }
+            )
+
+    def _validate(self, scope: Scope) -> None:
+        """Run every request check, raising HTTPException on the first failure."""
+        path = scope["path"]
+        headers = Headers(scope=scope)
         
-        # Get query parameters as a string
-        query_string = str(request.query_params)
+        # Check path
+        self._check_blocked_path(path)
         
-        # Get headers without standard ones to reduce false positives
-        sensitive_headers = ["cookie", "authorization"]
-        filtered_headers = {
-            k.lower(): v for k, v in request.headers.items() 
-            if k.lower() in sensitive_headers
-        }
+        # Check for path traversal in the URL path
+        if ".." in path:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "code": "INVALID_REQUEST",
+                    "message": "Path traversal attempt detected"
+                }
+            )
         
-        # Combine data for checking
-        data_to_check = [
-            path,
-            query_string,
-            decoded_query,  # Check the raw decoded query string
-            str(filtered_headers)
-        ]
+        # Check client IP
+        self._check_blocked_ip(scope, headers)
         
-        # Check patterns
-        for data in data_to_check:
-            if self.sql_injection_pattern.search(data):
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "code": "INVALID_REQUEST",
-                        "message": "Potential SQL injection detected"
-                    }
-                )
-            
-            if self.xss_pattern.search(data):
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "code": "INVALID_REQUEST",
-                        "message": "Potential XSS attack detected"
-                    }
-                )
-            
-            if self.path_traversal_pattern.search(data):
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "code": "INVALID_REQUEST",
-                        "message": "Path traversal attempt detected"
-                    }
-                )
-            
-            if self.command_injection_pattern.search(data):
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "code": "INVALID_REQUEST",
-                        "message": "Command injection attempt detected"
-                    }
-                )
-
-    def _add_security_headers(self, response: Response) -> Response:
-        """Add security headers to response."""
-        # Content Security Policy
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data:; "
-            "font-src 'self'; "
-            "connect-src 'self'"
-        )
-        
-        # Other security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        # Check content length
+        self._check_content_length(headers)
         
-        return response
+        # Check for common attack patterns
+        self._check_attack_patterns(path, scope["query_string"].decode("latin-1"), headers)
 
-    async def dispatch(
-        self, request: Request, call_next: Callable
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Validate request and dispatch to endpoint."""
         # Skip validation for certain paths (e.g., health checks)
-        if request.url.path in settings.VALIDATION_EXEMPT_PATHS:
-            return await call_next(request)
-            
+        if scope["type"] != "http" or scope["path"] in self.validation_exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        
         try:
-            # Check path
-            self._check_blocked_path(request)
-            
-            # Check for path traversal in the URL path
-            raw_path = request.url.path
-            if ".." in raw_path:
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "code": "INVALID_REQUEST",
-                        "message": "Path traversal attempt detected"
-                    }
-                )
-            
-            # Check client IP
-            self._check_blocked_ip(request)
-            
-            # Check content length
-            self._check_content_length(request)
-            
-            # Check for common attack patterns
-            self._check_attack_patterns(request)
-            
-            # Continue with request
-            response = await call_next(request)
-            
-            # Add security headers
-            return self._add_security_headers(response)
-        except Exception as e:
-            # Re-raise the exception
-            raise e
+            self._validate(scope)
+        except HTTPException as exc:
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+            await response(scope, receive, send)
+            return
+        
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add security headers, replacing any set downstream
+                headers = [
+                    header for header in message.get("headers", ())
+                    if header[0] not in _SECURITY_HEADER_NAMES
+                ]
+                headers.extend(_SECURITY_HEADERS)
+                message["headers"] = headers
+            await send(message)
+        
+        # Continue with request
+        await self.app(scope, receive, send_wrapper)
 
 def setup_validation_middleware(
     app: FastAPI,
@@ -1,8 +1,9 @@
-from typing import Dict, Set, Optional, List, Any
+from typing import Callable, Dict, Set, Optional, List, Any
+import asyncio
 from fastapi import WebSocket, WebSocketDisconnect
 from app.core.logging import websocket_logger
 from app.core.metrics import record_ws_event
-import json
+import orjson
 from app.schemas.notification import WebSocketMessage
 
 class WebSocketManager:
@@ -47,58 +48,71 @@ class WebSocketManager:
     
     async def broadcast_to_user(self, user_id: int, message: WebSocketMessage):
         """Send a message to all connections of a specific user."""
+        if user_id in self.active_connections:
+            await self._send_to_user(user_id, message.model_dump_json())
+    
+    async def _send_one(self, websocket: WebSocket, user_id: int, payload: str) -> Optional[WebSocket]:
+        """Send a serialized message to one connection, returning it if it is dead."""
+        try:
+            await websocket.send_text(payload)
+            record_ws_event(str(websocket.url), "message")
+        except WebSocketDisconnect:
+            return websocket
+        except Exception as e:
+            websocket_logger.error(
+                "Failed to send WebSocket message",
+                extra={
+                    "user_id": user_id,
+                    "error": str(e)
+                },
+                exc_info=True
+            )
+            return websocket
+        return None
+    
+    async def _send_to_user(self, user_id: int, payload: str):
+        """Send an already-serialized message to all connections of a user."""
         if user_id not in self.active_connections:
             return
-            
-        # Convert message to dict for JSON serialization
-        message_data = message.model_dump()
         
-        # Send to all user's connections
-        dead_connections = set()
-        for websocket in self.active_connections[user_id]:
-            try:
-                await websocket.send_json(message_data)
-                record_ws_event(str(websocket.url), "message", "sent")
-            except WebSocketDisconnect:
-                dead_connections.add(websocket)
-                continue
-            except Exception as e:
-                websocket_logger.error(
-                    "Failed to send WebSocket message",
-                    extra={
-                        "user_id": user_id,
-                        "error": str(e)
-                    },
-                    exc_info=True
-                )
-                dead_connections.add(websocket)
+        # Write to all of the user's connections concurrently
+        results = await asyncio.gather(*(
+            self._send_one(websocket, user_id, payload)
+            for websocket in list(self.active_connections[user_id])
+        ))
         
-        # Clean up dead connections
-        for dead_ws in dead_connections:
-            await self.disconnect(dead_ws, user_id)
+        # Clean up dead connections once every send has finished
+        for dead_ws in results:
+            if dead_ws is not None:
+                await self.disconnect(dead_ws, user_id)
+    
+    async def _send_to_users(self, user_ids: Set[int], build_payload: Callable[[], str]):
+        """Fan a message out to every connected user, serializing it only if needed."""
+        recipients = [user_id for user_id in user_ids if user_id in self.active_connections]
+        if not recipients:
+            return
+        payload = build_payload()
+        await asyncio.gather(*(self._send_to_user(user_id, payload) for user_id in recipients))
     
     async def broadcast_to_users(self, user_ids: Set[int], message: WebSocketMessage):
-        """Send a message to multiple users."""
-        for user_id in user_ids:
-            await self.broadcast_to_user(user_id, message)
+        """Send a message to multiple users, serializing it only once."""
+        await self._send_to_users(user_ids, message.model_dump_json)
             
     async def broadcast(self, user_ids: List[int] | Set[int], message_type: str, data: Dict[str, Any]):
         """
-        Create a WebSocketMessage and broadcast it to a list of users.
+        Build a message from the type and data and broadcast it to a list of users.
         This is a convenience method used by the event CRUD operations.
         """
-        # Create a WebSocketMessage from the provided type and data
-        message = WebSocketMessage(
-            type=message_type,
-            data=data
-        )
-        
         # Convert list to set if needed
         if isinstance(user_ids, list):
             user_ids = set(user_ids)
-            
-        # Broadcast to all specified users
-        await self.broadcast_to_users(user_ids, message)
+        
+        # Encode the frame with orjson, skipping WebSocketMessage validation;
+        # callers pass a fixed message type
+        await self._send_to_users(
+            user_ids,
+            lambda: orjson.dumps({"type": message_type, "data": data}, default=str).decode()
+        )
 
 # Global WebSocket manager instance
 ws_manager = WebSocketManager() 
\ No newline at end of file
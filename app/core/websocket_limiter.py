@@ -1,13 +1,13 @@
-from datetime import datetime, timedelta
-from typing import Dict, Set
+from typing import Dict, List, Set
 import asyncio
+import time
 from fastapi import WebSocket, WebSocketDisconnect
 from app.core.config import settings
 
 class WebSocketRateLimiter:
     def __init__(self):
         self.connections: Dict[int, Set[WebSocket]] = {}  # user_id -> connections
-        self.message_counts: Dict[int, Dict[datetime, int]] = {}  # user_id -> {timestamp -> count}
+        self.buckets: Dict[int, List[float]] = {}  # user_id -> [tokens, last refill (monotonic)]
         self.max_connections_per_user = 5
         self.max_messages_per_minute = 60
         self._cleanup_task = None
@@ -39,21 +39,24 @@ class WebSocketRateLimiter:
                 # Log error but continue running
                 continue
 
+    def _refill(self, bucket: List[float], now: float) -> float:
+        """Top up a bucket for the time since its last refill and return its tokens."""
+        capacity = float(self.max_messages_per_minute)
+        bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * capacity / 60.0)
+        bucket[1] = now
+        return bucket[0]
+
+    def _drop_if_full(self, user_id: int, now: float) -> None:
+        """Forget a user's bucket once it has refilled, as a new one would be identical."""
+        bucket = self.buckets.get(user_id)
+        if bucket is not None and self._refill(bucket, now) >= self.max_messages_per_minute:
+            del self.buckets[user_id]
+
     async def _cleanup_old_counts(self):
-        """Remove message counts older than 1 minute."""
-        now = datetime.utcnow()
-        cutoff = now - timedelta(minutes=1)
-        
-        for user_id in list(self.message_counts.keys()):
-            counts = self.message_counts[user_id]
-            # Remove old timestamps
-            self.message_counts[user_id] = {
-                ts: count for ts, count in counts.items()
-                if ts > cutoff
-            }
-            # Remove user if no recent messages
-            if not self.message_counts[user_id]:
-                del self.message_counts[user_id]
+        """Remove buckets of users who have been idle long enough to refill."""
+        now = time.monotonic()
+        for user_id in list(self.buckets.keys()):
+            self._drop_if_full(user_id, now)
 
     async def connect(self, websocket: WebSocket, user_id: int):
         """Handle new WebSocket connection."""
@@ -75,25 +78,19 @@ class WebSocketRateLimiter:
             self.connections[user_id].discard(websocket)
             if not self.connections[user_id]:
                 del self.connections[user_id]
+                self._drop_if_full(user_id, time.monotonic())
 
     async def check_rate_limit(self, user_id: int) -> bool:
         """Check if user has exceeded message rate limit."""
-        now = datetime.utcnow()
-        if user_id not in self.message_counts:
-            self.message_counts[user_id] = {}
+        now = time.monotonic()
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            bucket = self.buckets[user_id] = [float(self.max_messages_per_minute), now]
         
-        # Count messages in the last minute
-        cutoff = now - timedelta(minutes=1)
-        recent_count = sum(
-            count for ts, count in self.message_counts[user_id].items()
-            if ts > cutoff
-        )
-        
-        if recent_count >= self.max_messages_per_minute:
+        # Each message spends one token; tokens refill at the per-minute rate
+        if self._refill(bucket, now) < 1.0:
             return False
-        
-        # Update message count
-        self.message_counts[user_id][now] = self.message_counts[user_id].get(now, 0) + 1
+        bucket[0] -= 1.0
         return True
 
     async def broadcast_to_user(self, user_id: int, message: str):
@@ -1,8 +1,8 @@
 from datetime import datetime, timedelta, UTC
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select, and_, or_, func
+from typing import List, Optional, Dict, Any, Iterable, Set, Tuple
+from sqlalchemy import select, and_, or_, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 
 from app.models.event import Event
 from app.models.permission import EventPermission
@@ -14,11 +14,55 @@ from app.schemas.event import (
     EventPermissionCreate, EventFilter, DateRangeQuery,
     BaseSchema
 )
+from app.core.cache import Cache
 from app.core.websocket import ws_manager
 from app.crud import notification as crud_notification
 from app.schemas.notification import WebSocketMessage
 from app.core.exceptions import PermissionDenied, ResourceNotFound
 
+# Per-user generation counters for cached event listings. Bumping a user's
+# generation orphans their cached pages, which then age out by TTL.
+_event_list_generations: Dict[int, int] = {}
+
+def event_list_generation(user_id: int) -> int:
+    """Current listing cache generation for a user"""
+    return _event_list_generations.get(user_id, 0)
+
+def invalidate_event_lists(user_ids: Iterable[int]) -> None:
+    """Invalidate cached event listings for the given users"""
+    for user_id in user_ids:
+        _event_list_generations[user_id] = _event_list_generations.get(user_id, 0) + 1
+
+# Permission roles keyed by "event_id:user_id"; "" records that there is none
+_role_cache = Cache(default_ttl=60)
+
+# Role hierarchy used by permission checks
+_ROLE_LEVELS = {
+    "OWNER": 3,
+    "EDITOR": 2,
+    "VIEWER": 1
+}
+
+# Per-event generation counters for cached event details, bumped on every
+# change to the event or its permissions
+_event_generations: Dict[int, int] = {}
+
+def event_generation(event_id: int) -> int:
+    """Current detail cache generation for an event"""
+    return _event_generations.get(event_id, 0)
+
+def invalidate_event(event_id: int) -> None:
+    """Invalidate the cached details of an event"""
+    _event_generations[event_id] = _event_generations.get(event_id, 0) + 1
+
+async def _event_user_ids(db: AsyncSession, event: Event) -> Set[int]:
+    """Get the ids of all users with access to an event"""
+    result = await db.execute(
+        select(EventPermission.user_id)
+        .where(EventPermission.event_id == event.id)
+    )
+    return {event.owner_id, *result.scalars().all()}
+
 async def _notify_event_users(
     db: AsyncSession,
     event: Event,
@@ -29,17 +73,9 @@ async def _notify_event_users(
 ) -> None:
     """Helper function to notify users about event changes"""
     # Get all users with access to the event
-    users = {event.owner_id}
-    
-    # Get permissions with eager loading
-    result = await db.execute(
-        select(EventPermission)
-        .where(EventPermission.event_id == event.id)
-    )
-    permissions = result.scalars().all()
-    
-    for permission in permissions:
-        users.add(permission.user_id)
+    users = await _event_user_ids(db, event)
+    invalidate_event_lists(users)
+    invalidate_event(event.id)
     
     # Remove excluded user if any
     if exclude_user_id is not None:
@@ -148,6 +184,7 @@ async def create_event(
     
     await db.commit()
     await db.refresh(db_event)
+    invalidate_event_lists([owner.id])
     
     return db_event
 
@@ -221,8 +258,14 @@ async def create_events_batch(
         db.add(version)
     
     await db.commit()
-    for db_event in db_events:
-        await db.refresh(db_event)
+    
+    # Reload server-generated columns for the whole batch in one round trip
+    await db.execute(
+        select(Event)
+        .where(Event.id.in_([db_event.id for db_event in db_events]))
+        .execution_options(populate_existing=True)
+    )
+    invalidate_event_lists([owner.id])
     
     return db_events
 
@@ -367,8 +410,11 @@ async def delete_event(
     """Delete an event"""
     if hard_delete:
         # Permanently delete the event
+        user_ids = await _event_user_ids(db, db_event)
         await db.delete(db_event)
         await db.commit()
+        invalidate_event_lists(user_ids)
+        invalidate_event(db_event.id)
         return
         
     now = datetime.now(UTC)
@@ -512,6 +558,7 @@ async def create_event_permission(
     db.add(event)
     await db.commit()
     await db.refresh(permission)
+    await invalidate_role(event.id, permission_in.user_id)
     
     # Notify the user about the permission grant
     await _notify_event_users(
@@ -603,6 +650,7 @@ async def update_event_permission(
     db.add(event)
     await db.commit()
     await db.refresh(permission)
+    await invalidate_role(event.id, user_id)
     
     # Notify the user about the permission update
     await _notify_event_users(
@@ -679,6 +727,8 @@ async def delete_event_permission(
     db.add(version)
     db.add(event)
     await db.commit()
+    await invalidate_role(event.id, user_id)
+    invalidate_event_lists([user_id])
     
     # Notify the user about the permission removal
     await _notify_event_users(
@@ -730,22 +780,17 @@ async def get_event_versions(
     skip = 0 if skip is None else int(skip)
     limit = 100 if limit is None else int(limit)
     
+    # History responses carry only changed_by_id; fail loudly rather than
+    # lazy-load the user once per version if that ever changes
     result = await db.execute(
         select(EventVersion)
+        .options(raiseload(EventVersion.changed_by), raiseload(EventVersion.event))
         .where(EventVersion.event_id == event.id)
         .order_by(EventVersion.version_number.desc())
         .offset(skip)
         .limit(limit)
     )
-    versions = result.scalars().all()
-    
-    # Debug logging to help identify the issue
-    print(f"Found {len(versions)} versions for event {event.id}")
-    if versions:
-        version_numbers = [v.version_number for v in versions]
-        print(f"Version numbers: {version_numbers}")
-    
-    return versions
+    return result.scalars().all()
 
 async def rollback_event(
     db: AsyncSession,
@@ -810,6 +855,8 @@ async def rollback_event(
     
     await db.commit()
     await db.refresh(event)
+    invalidate_event_lists(await _event_user_ids(db, event))
+    invalidate_event(event.id)
     return event
 
 async def get_event_diff(
@@ -819,8 +866,16 @@ async def get_event_diff(
     version2: int
 ) -> Dict[str, Any]:
     """Get the difference between two versions of an event"""
-    v1 = await get_event_version(db, event, version1)
-    v2 = await get_event_version(db, event, version2)
+    # Load both versions in one round trip
+    result = await db.execute(
+        select(EventVersion).where(
+            EventVersion.event_id == event.id,
+            EventVersion.version_number.in_((version1, version2))
+        )
+    )
+    versions = {version.version_number: version for version in result.scalars().all()}
+    v1 = versions.get(version1)
+    v2 = versions.get(version2)
     
     if not v1 or not v2:
         raise ValueError("One or both versions not found")
@@ -869,60 +924,148 @@ async def get_event_diff(
         "changed_at": v2.created_at
     }
 
-async def get_events_in_range(
+def _accessible_events_query(user: User):
+    """Select the non-deleted events a user owns or holds a permission on"""
+    return select(Event).where(
+        Event.is_deleted == False,
+        or_(
+            Event.owner_id == user.id,
+            Event.id.in_(
+                select(EventPermission.event_id)
+                .where(EventPermission.user_id == user.id)
+            )
+        )
+    )
+
+def _single_events_in_range_query(
+    user: User,
+    start_time: datetime,
+    end_time: datetime,
+    include_recurring: bool
+):
+    """Select events listed once, by their own start time, within the range"""
+    query = _accessible_events_query(user).where(
+        Event.start_time >= start_time,
+        Event.start_time <= end_time
+    )
+    if include_recurring:
+        query = query.where(Event.is_recurring == False)
+    return query
+
+async def _recurring_occurrences_in_range(
+    db: AsyncSession,
+    user: User,
+    start_time: datetime,
+    end_time: datetime
+) -> List[Dict[str, Any]]:
+    """Expand the user's recurring events into occurrences within the range"""
+    result = await db.execute(
+        _accessible_events_query(user).where(Event.is_recurring == True)
+    )
+    return [
+        {
+            "event": event,
+            "start_time": occurrence["start_time"],
+            "end_time": occurrence["end_time"],
+            "is_recurring": True,
+            "is_original": occurrence["is_original"]
+        }
+        for event in result.scalars().all()
+        for occurrence in event.get_occurrences(start_time, end_time)
+    ]
+
+async def get_events_page(
     db: AsyncSession,
     user: User,
     start_time: datetime,
     end_time: datetime,
     include_recurring: bool = True,
     skip: int = 0,
-    limit: int = 100
-) -> List[Dict[str, Any]]:
-    """Get all events (including recurring occurrences) in a date range"""
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Get one page of events (including recurring occurrences) and the range total
+    
+    Results are ordered by (start_time, event id). Passing the last seen
+    pair as ``after`` seeks straight to the next page instead of skipping.
+    """
     # Ensure skip and limit are valid integers with defaults
     skip = 0 if skip is None else int(skip)
     limit = 100 if limit is None else int(limit)
     
-    # Get base events that the user can access
-    events = await get_user_accessible_events(db, user, skip=0, limit=None)
-    
-    # Filter events in the date range and handle recurring events
-    result = []
-    for event in events:
-        if event.is_recurring and include_recurring:
-            # Get all occurrences in the range
-            occurrences = event.get_occurrences(start_time, end_time)
-            for occurrence in occurrences:
-                result.append({
-                    "event": event,
-                    "start_time": occurrence["start_time"],
-                    "end_time": occurrence["end_time"],
-                    "is_recurring": True,
-                    "is_original": occurrence["is_original"]
-                })
-        else:
-            # Check if non-recurring event falls in the range
-            if start_time <= event.start_time <= end_time:
-                result.append({
-                    "event": event,
-                    "start_time": event.start_time,
-                    "end_time": event.end_time,
-                    "is_recurring": False,
-                    "is_original": True
-                })
-    
-    # Sort by start time
-    result.sort(key=lambda x: x["start_time"])
-    
-    # Apply pagination - safely handle the case where skip or limit might be None
-    if not result:
-        return []
-        
-    end_idx = min(skip + limit, len(result))
-    if skip >= len(result):
-        return []
-        
-    return result[skip:end_idx]
+    # Single events are filtered, ordered and cut off in SQL; no more than
+    # skip + limit of them can land on the requested page
+    query = _single_events_in_range_query(user, start_time, end_time, include_recurring)
+    if after is None:
+        # COUNT(*) OVER () is computed before LIMIT, so it is the range total
+        rows = (await db.execute(
+            query.add_columns(func.count().over())
+            .order_by(Event.start_time, Event.id)
+            .limit(skip + limit)
+        )).all()
+        single_events = [row[0] for row in rows]
+        total = rows[0][1] if rows else 0
+    else:
+        # The cursor narrows the query, so the total needs its own count
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        single_result = await db.execute(
+            query.where(tuple_(Event.start_time, Event.id) > tuple_(*after))
+            .order_by(Event.start_time, Event.id)
+            .limit(skip + limit)
+        )
+        single_events = single_result.scalars().all()
+    
+    result = [
+        {
+            "event": event,
+            "start_time": event.start_time,
+            "end_time": event.end_time,
+            "is_recurring": False,
+            "is_original": True
+        }
+        for event in single_events
+    ]
+    
+    # Recurring occurrences are computed from the RRULE, so merge them in Python
+    if include_recurring:
+        occurrences = await _recurring_occurrences_in_range(db, user, start_time, end_time)
+        total += len(occurrences)
+        if after is not None:
+            occurrences = [
+                occurrence for occurrence in occurrences
+                if (occurrence["start_time"], occurrence["event"].id) > after
+            ]
+        result.extend(occurrences)
+    
+    # Sort by start time, breaking ties by id to match the SQL order
+    result.sort(key=lambda x: (x["start_time"], x["event"].id))
+    
+    return result[skip:skip + limit], total
+
+async def get_effective_role(
+    db: AsyncSession,
+    event_id: int,
+    user_id: int
+) -> Optional[str]:
+    """Get a user's permission role on an event, cached briefly per (event, user)"""
+    key = f"{event_id}:{user_id}"
+    role = await _role_cache.get(key)
+    if role is None:
+        permission_role = await db.scalar(
+            select(EventPermission.role)
+            .where(
+                EventPermission.event_id == event_id,
+                EventPermission.user_id == user_id
+            )
+        )
+        # Cache misses too, as an empty role
+        role = permission_role.value if permission_role else ""
+        await _role_cache.set(key, role)
+    return role or None
+
+async def invalidate_role(event_id: int, user_id: int) -> None:
+    """Drop a cached role after the user's permission on the event changes"""
+    await _role_cache.delete(f"{event_id}:{user_id}")
 
 async def has_permission(
     db: AsyncSession,
@@ -931,30 +1074,79 @@ async def has_permission(
     required_role: str = "VIEWER"
 ) -> bool:
     """Check if a user has the required permission level for this event"""
-    if user.is_superuser or user.id == event.owner_id:
+    return await has_event_role(db, event.id, event.owner_id, user, required_role)
+
+async def has_event_role(
+    db: AsyncSession,
+    event_id: int,
+    owner_id: int,
+    user: User,
+    required_role: str = "VIEWER"
+) -> bool:
+    """Check a user's permission level from an event's id and owner alone"""
+    if user.is_superuser or user.id == owner_id:
         return True
-        
-    result = await db.execute(
-        select(EventPermission)
+    
+    role = await get_effective_role(db, event_id, user.id)
+    return _role_satisfies(role, required_role)
+
+def _role_satisfies(role: Optional[str], required_role: str) -> bool:
+    """Check a permission role against the required level"""
+    if role:
+        return _ROLE_LEVELS[role] >= _ROLE_LEVELS[required_role]
+    return False
+
+async def get_event_authorized(
+    db: AsyncSession,
+    event_id: int,
+    user: User,
+    required_role: str = "VIEWER",
+    with_owner: bool = False
+) -> Optional[Tuple[Event, bool]]:
+    """Get an event and whether the user holds the required role, in one query
+    
+    With ``with_owner`` the owner is joined in too, so a later get_owner is
+    answered from the session's identity map.
+    """
+    query = select(Event, EventPermission.role)
+    if with_owner:
+        query = query.options(joinedload(Event.owner))
+    row = (await db.execute(
+        query
+        .outerjoin(
+            EventPermission,
+            and_(
+                EventPermission.event_id == Event.id,
+                EventPermission.user_id == user.id
+            )
+        )
         .where(
-            EventPermission.event_id == event.id,
-            EventPermission.user_id == user.id
+            Event.id == event_id,
+            Event.is_deleted == False
         )
-    )
-    permission = result.scalar_one_or_none()
+    )).first()
+    if row is None:
+        return None
     
-    if permission:
-        role_values = {
-            "OWNER": 3,
-            "EDITOR": 2,
-            "VIEWER": 1
-        }
-        return role_values[permission.role] >= role_values[required_role]
-    return False 
+    event, permission_role = row
+    if user.is_superuser or user.id == event.owner_id:
+        return event, True
+    
+    role = permission_role.value if permission_role else ""
+    await _role_cache.set(f"{event_id}:{user.id}", role)
+    return event, _role_satisfies(role, required_role)
 
 async def get_owner(db: AsyncSession, event: Event) -> User:
-    """Get the owner of an event."""
+    """Get the owner of an event, from the identity map when already loaded."""
     owner = await db.get(User, event.owner_id)
     if not owner:
         raise ValueError("Event owner not found")
-    return owner 
\ No newline at end of file
+    return owner
+
+async def get_owners(db: AsyncSession, events: Iterable[Event]) -> Dict[int, User]:
+    """Get the owners of several events with one IN query, keyed by user id."""
+    owner_ids = {event.owner_id for event in events}
+    if not owner_ids:
+        return {}
+    result = await db.execute(select(User).where(User.id.in_(owner_ids)))
+    return {owner.id: owner for owner in result.scalars().all()}
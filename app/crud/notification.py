@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta, UTC
-from sqlalchemy import select, update, delete, and_
+from sqlalchemy import select, update, delete, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.notification import Notification
@@ -46,16 +46,29 @@ async def get_notification(
 async def get_user_notifications(
     db: AsyncSession,
     user_id: int,
-    unread_only: bool = False
+    unread_only: bool = False,
+    skip: int = 0,
+    limit: Optional[int] = None
 ) -> List[Notification]:
-    """Get all notifications for a user."""
+    """Get a user's notifications, newest first, optionally one page of them."""
     query = select(Notification).where(Notification.user_id == user_id)
     if unread_only:
         query = query.where(Notification.is_read == False)
-    query = query.order_by(Notification.created_at.desc())
+    query = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     return list(result.scalars().all())
 
+async def get_notifications_state(
+    db: AsyncSession,
+    user_id: int
+) -> str:
+    """Summarize a user's notifications as latest update and count, for ETags."""
+    row = (await db.execute(
+        select(func.max(Notification.updated_at), func.count())
+        .where(Notification.user_id == user_id)
+    )).one()
+    return f"{row[0]}:{row[1]}"
+
 async def mark_notification_read(
     db: AsyncSession,
     notification_id: int,
@@ -87,24 +100,19 @@ async def mark_all_read(
     db: AsyncSession,
     user_id: int
 ) -> int:
-    """Mark all notifications as read for a user."""
+    """Mark all notifications as read for a user with a single UPDATE."""
     result = await db.execute(
-        select(Notification).where(
+        update(Notification)
+        .where(
             and_(
                 Notification.user_id == user_id,
                 Notification.is_read == False
             )
         )
+        .values(is_read=True, updated_at=datetime.now(UTC))
     )
-    notifications = result.scalars().all()
-    current_time = datetime.now(UTC)
-    count = 0
-    for notification in notifications:
-        notification.is_read = True
-        notification.updated_at = current_time
-        count += 1
     await db.commit()
-    return count
+    return result.rowcount
 
 async def delete_old_notifications(
     db: AsyncSession,
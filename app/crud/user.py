@@ -1,35 +1,69 @@
 from datetime import datetime, UTC
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
-from app.core.security import get_password_hash
+from app.core.cache import Cache
+from app.core.security import aget_password_hash
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+# Column snapshots of recently looked-up users, keyed by email. Auth reads
+# (login, refresh, every authenticated request) far outnumber user writes.
+_user_cache = Cache(default_ttl=30)
+
+def _user_columns(user: User) -> dict:
+    """Snapshot a user's column values for caching"""
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+async def invalidate_user_cache(email: str) -> None:
+    """Drop the cached lookup for an email after the user row changes"""
+    await _user_cache.delete(email)
+
 async def get_user_by_email(db: AsyncSession, *, email: str) -> User | None:
     """Get a user by email"""
+    columns = await _user_cache.get(email)
+    if columns is not None:
+        # Rebuild a detached instance and attach it without a SELECT
+        user = User(**columns)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
     result = await db.execute(select(User).where(User.email == email))
-    return result.scalar_one_or_none()
-
-async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
-    """Create a new user"""
-    db_user = User(
-        email=user_in.email,
-        username=user_in.username,
-        full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
-        updated_at=datetime.now(UTC)
+    user = result.scalar_one_or_none()
+    if user is not None:
+        await _user_cache.set(email, _user_columns(user))
+    return user
+
+async def create_user(db: AsyncSession, user_in: UserCreate) -> User | None:
+    """Create a new user, returning None if the email is already registered"""
+    insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+    stmt = (
+        insert(User)
+        .values(
+            email=user_in.email,
+            username=user_in.username,
+            full_name=user_in.full_name,
+            hashed_password=await aget_password_hash(user_in.password),
+            updated_at=datetime.now(UTC)
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
     )
-    db.add(db_user)
+    result = await db.execute(stmt)
+    db_user = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(db_user)
+    if db_user is not None:
+        await invalidate_user_cache(db_user.email)
     return db_user
 
 async def update_user(db: AsyncSession, *, db_user: User, user_in: UserUpdate) -> User:
     """Update a user"""
+    await invalidate_user_cache(db_user.email)
     update_data = user_in.model_dump(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await aget_password_hash(update_data.pop("password"))
     
     for field, value in update_data.items():
         setattr(db_user, field, value)
@@ -37,4 +71,12 @@ async def update_user(db: AsyncSession, *, db_user: User, user_in: UserUpdate) -
     db_user.updated_at = datetime.now(UTC)
     await db.commit()
     await db.refresh(db_user)
-    return db_user 
\ No newline at end of file
+    await invalidate_user_cache(db_user.email)
+    return db_user
+
+async def rehash_password(db: AsyncSession, *, db_user: User, password: str) -> None:
+    """Store a fresh hash of a just-verified password under the current policy"""
+    db_user.hashed_password = await aget_password_hash(password)
+    db_user.updated_at = datetime.now(UTC)
+    await db.commit()
+    await invalidate_user_cache(db_user.email)
@@ -1,5 +1,7 @@
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker, async_scoped_session
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
@@ -7,34 +9,44 @@ from app.models.base import Base
 import os
 from pathlib import Path
 
+database_url = settings.DATABASE_URL
+
 # Ensure SQLite directory exists
-if settings.DATABASE_URL.startswith('sqlite'):
-    db_path = Path(settings.DATABASE_URL.split('///')[1]).parent
+if database_url.startswith('sqlite'):
+    db_path = Path(database_url.split('///')[1]).parent
     db_path.mkdir(exist_ok=True)
     
     # SQLite-specific connect args
     connect_args = {"check_same_thread": False}
 else:
-    # PostgreSQL or other database connect args
+    # Hosted providers hand out plain postgres:// URLs; route them through asyncpg
+    for prefix in ("postgres://", "postgresql://"):
+        if database_url.startswith(prefix):
+            database_url = "postgresql+asyncpg://" + database_url[len(prefix):]
+            break
+    
+    # asyncpg connect args
     connect_args = {
         "timeout": 10,  # Connection timeout in seconds
-        "statement_timeout": 10000,  # Statement timeout in milliseconds
         "command_timeout": 10,  # Command timeout in seconds
-        "keepalives": 1,  # Enable TCP keepalive
-        "keepalives_idle": 30,  # Idle time before sending keepalive
-        "keepalives_interval": 10,  # Interval between keepalives
-        "keepalives_count": 5,  # Number of keepalive attempts
+        "server_settings": {
+            "statement_timeout": "10000",  # Statement timeout in milliseconds
+        },
+        # Reuse server-side prepared statements for the hot lookups
+        # (get_event, has_permission, get_owner) instead of re-planning them
+        "statement_cache_size": 1024,  # asyncpg's own per-connection cache
+        "prepared_statement_cache_size": 1024,  # SQLAlchemy asyncpg adapter cache
     }
 
 # Create async engine with optimized pool settings
 engine = create_async_engine(
-    settings.DATABASE_URL,
+    database_url,
     echo=settings.SQL_ECHO,
-    pool_size=20,  # Maximum number of connections in the pool
-    max_overflow=10,  # Maximum number of connections that can be created beyond pool_size
-    pool_timeout=30,  # Seconds to wait before giving up on getting a connection
-    pool_recycle=1800,  # Recycle connections after 30 minutes
-    pool_pre_ping=True,  # Enable connection health checks
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,  # Fail fast instead of queueing behind an exhausted pool
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     poolclass=AsyncAdaptedQueuePool,  # Use queue-based pooling for async
     connect_args=connect_args
 )
@@ -48,26 +60,29 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+# One session per asyncio task, so nested dependencies within a request share it
+AsyncScopedSession = async_scoped_session(AsyncSessionLocal, scopefunc=asyncio.current_task)
+
 # Create declarative base for models
 Base = declarative_base()
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting async database sessions"""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close() 
+    session = AsyncScopedSession()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await AsyncScopedSession.remove()
 
 async def init_db():
     """Initialize database with required extensions and settings."""
     async with engine.begin() as conn:
         # Enable pg_trgm extension for text search if using PostgreSQL
-        if not settings.DATABASE_URL.startswith('sqlite'):
+        if not database_url.startswith('sqlite'):
             try:
                 await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
             except Exception:
@@ -76,6 +91,14 @@ async def init_db():
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
 
+async def warm_pool():
+    """Open the pool's base connections up front so first requests don't pay for connecting."""
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    await asyncio.gather(*(ping() for _ in range(engine.pool.size())))
+
 async def dispose_db():
     """Properly dispose of database connections."""
     await engine.dispose() 
\ No newline at end of file
@@ -1,56 +1,28 @@
-from logging.handlers import RotatingFileHandler
 from fastapi import FastAPI, Depends, status, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from pydantic import BaseModel
 import logging
-import sys
 from contextlib import asynccontextmanager
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+import orjson
 from fastapi.exceptions import RequestValidationError
 
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.rate_limit import rate_limit_dependency, limiter
+from app.core.rate_limit import rate_limit_dependency
 from app.core.cache import cache
 from app.core.exceptions import CustomException
+from app.core.logging import setup_logging, stop_logging
 from app.core.middleware import (
     SecurityHeadersMiddleware,
     RequestValidationMiddleware,
     RateLimitMiddleware
 )
-from app.db.database import init_db, dispose_db
+from app.db.database import init_db, warm_pool, dispose_db
 
 # ─── Logging Configuration ───────────────────────────────────────────
 
-def setup_logging():
-    log_format = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-    formatter = logging.Formatter(log_format)
-
-    root_logger = logging.getLogger()
-    root_logger.setLevel(settings.LOG_LEVEL.upper())
-
-    # Remove default handlers
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
-
-    if settings.ENVIRONMENT.lower() == "development":
-        handler = logging.StreamHandler(sys.stdout)
-    else:
-        try:
-            handler = RotatingFileHandler(
-                filename=settings.LOG_FILE_PATH if hasattr(settings, "LOG_FILE_PATH") else "app.log",
-                maxBytes=10_000_000,
-                backupCount=3
-            )
-        except (PermissionError, FileNotFoundError):
-            # Fallback to stdout in case file logging isn't possible (e.g. in Railway)
-            handler = logging.StreamHandler(sys.stdout)
-            logging.warning("File logging not possible, falling back to stdout")
-
-    handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
-
 setup_logging()
 logger = logging.getLogger(__name__)
 
@@ -71,18 +43,20 @@ async def lifespan(app: FastAPI):
         logger.info("Initializing database...")
         await init_db()
         logger.info("Database initialized successfully")
+        await warm_pool()
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
     
-    limiter.start_cleanup()
     cache.start_cleanup()
     
+    # Build the OpenAPI schema now rather than on the first docs request
+    app.openapi()
+    
     yield
     
     # Shutdown
     print("Shutting down...")
     logger.info("Shutting down application...")
-    limiter.stop_cleanup()
     cache.stop_cleanup()
     
     # Dispose database connections
@@ -91,6 +65,9 @@ async def lifespan(app: FastAPI):
         logger.info("Database connections disposed")
     except Exception as e:
         logger.error(f"Error disposing database connections: {e}")
+    
+    # Last, so records logged during shutdown are written out too
+    stop_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -248,6 +225,21 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+# Serve the schema as bytes encoded once, instead of re-encoding the dict per request
+_openapi_json: bytes | None = None
+
+async def openapi_json(request: Request) -> Response:
+    global _openapi_json
+    if _openapi_json is None:
+        _openapi_json = orjson.dumps(app.openapi())
+    return Response(content=_openapi_json, media_type="application/json")
+
+app.router.routes = [
+    route for route in app.router.routes
+    if getattr(route, "path", None) != app.openapi_url
+]
+app.add_route(app.openapi_url, openapi_json, include_in_schema=False)
+
 @app.get(
     "/",
     response_model=WelcomeResponse,
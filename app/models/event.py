@@ -59,26 +59,12 @@ class Event(Base):
     __table_args__ = (
         Index('ix_event_date_range', 'start_time', 'end_time'),
         Index('ix_event_owner_dates', 'owner_id', 'start_time', 'end_time'),
+        Index('ix_event_owner_start_id', 'owner_id', 'start_time', 'id'),
     )
     
     def __repr__(self):
         return f"<Event(id={self.id}, title={self.title})>"
     
-    def has_permission(self, user: Any, required_role: str = "VIEWER") -> bool:
-        """Check if a user has the required permission level for this event"""
-        if user.is_superuser or user.id == self.owner_id:
-            return True
-            
-        for permission in self.permissions:
-            if permission.user_id == user.id:
-                role_values = {
-                    "OWNER": 3,
-                    "EDITOR": 2,
-                    "VIEWER": 1
-                }
-                return role_values[permission.role] >= role_values[required_role]
-        return False
-    
     def add_version(self, changed_by: Any, changes: Dict[str, Any], description: str | None = None) -> Any:
         """Create a new version of this event"""
         from .version import EventVersion
@@ -1,9 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class Token(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     refresh_token: str | None = None
-    token_type: str
+    token_type: str = "bearer"
  
 class TokenPayload(BaseModel):
     sub: str | None = None  # subject (user email) 
@@ -29,9 +29,6 @@ class UserResponse(UserBase):
     is_active: bool = True
     is_superuser: bool = False
 
-    class Config:
-        from_attributes = True
-
 class Token(BaseModel):
     """Schema for JWT token"""
     access_token: str
@@ -1,27 +1,29 @@
 from typing import Dict, Any
-from datetime import datetime
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, UTC
 
 from app.models.event import Event
+from app.models.user import User
 from app.schemas.event import EventResponse, UserInfo
-from app.crud.event import get_owner
 
-async def create_event_response(db: AsyncSession, event: Event, start_time: datetime | None = None, end_time: datetime | None = None) -> EventResponse:
-    """Create a standardized event response."""
-    owner = await get_owner(db, event)
-    
+def _as_utc(dt: datetime) -> datetime:
+    """Attach UTC to naive datetimes, as EventBase's validator would."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
+
+def build_event_response(event: Event, owner: User, start_time: datetime | None = None, end_time: datetime | None = None) -> EventResponse:
+    """Create a standardized event response from an already-loaded owner."""
+    # Rows were validated on the way in, so skip re-validating them on the way out
     response_data = {
         "id": event.id,
         "title": event.title,
         "description": event.description,
         "location": event.location,
-        "start_time": start_time or event.start_time,
-        "end_time": end_time or event.end_time,
+        "start_time": _as_utc(start_time or event.start_time),
+        "end_time": _as_utc(end_time or event.end_time),
         "is_recurring": event.is_recurring,
         "recurrence_pattern": event.recurrence_pattern,
-        "created_by": UserInfo(id=owner.id, email=owner.email),
+        "created_by": UserInfo.model_construct(id=owner.id, email=owner.email),
         "created_at": event.created_at,
         "updated_at": event.updated_at
     }
     
-    return EventResponse(**response_data) 
\ No newline at end of file
+    return EventResponse.model_construct(**response_data)
@@ -21,6 +21,9 @@ from app.core.config import settings
 from app.core.rate_limit import rate_limit_dependency
 from app.models import User, Event, EventPermission, EventVersion, Notification  # Import all models
 from app.core.security import create_access_token, create_refresh_token, get_password_hash
+from app.crud.user import _user_cache
+from app.api.v1.endpoints.events import _event_list_cache, _event_cache
+from app.crud.event import _role_cache
 
 # Use a separate test database
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
@@ -73,6 +76,10 @@ async def create_test_db():
 async def setup_db():
     """Setup database for each test."""
     # Start with a clean slate for each test
+    await _user_cache.clear()
+    await _event_list_cache.clear()
+    await _event_cache.clear()
+    await _role_cache.clear()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
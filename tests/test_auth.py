@@ -1,6 +1,10 @@
 import pytest
+import bcrypt
 from httpx import AsyncClient
 from fastapi import status
+from sqlalchemy import select
+
+from app.models import User
 
 pytestmark = pytest.mark.asyncio
 
@@ -19,6 +23,25 @@ async def test_login_success(client: AsyncClient, test_user):
     assert "refresh_token" in data
     assert data["token_type"] == "bearer"
 
+async def test_login_rehashes_outdated_hash(client: AsyncClient, db_session, test_user):
+    """Test a login upgrades a hash stored with a different bcrypt cost."""
+    test_user.hashed_password = bcrypt.hashpw(b"testpass123", bcrypt.gensalt(rounds=4)).decode()
+    await db_session.commit()
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "test@example.com",
+            "password": "testpass123"
+        }
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    stored = await db_session.scalar(
+        select(User.hashed_password).where(User.email == "test@example.com")
+    )
+    assert stored.startswith("$2b$10$")
+
 async def test_login_wrong_password(client: AsyncClient, test_user):
     """Test login with wrong password."""
     response = await client.post(
@@ -30,6 +53,19 @@ async def test_login_wrong_password(client: AsyncClient, test_user):
     )
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+async def test_repeat_login_rejects_wrong_password(client: AsyncClient, test_user):
+    """Test a cached successful login does not accept a different password."""
+    for password, expected in (
+        ("testpass123", status.HTTP_200_OK),
+        ("testpass123", status.HTTP_200_OK),
+        ("wrongpass", status.HTTP_401_UNAUTHORIZED),
+    ):
+        response = await client.post(
+            "/api/v1/auth/login",
+            data={"username": "test@example.com", "password": password}
+        )
+        assert response.status_code == expected
+
 async def test_register_success(client: AsyncClient):
     """Test successful user registration."""
     response = await client.post(
@@ -68,10 +104,42 @@ async def test_refresh_token(client: AsyncClient, test_user, test_user_refresh_t
     assert "access_token" in data
     assert "refresh_token" in data
 
+async def test_refresh_token_invalid(client: AsyncClient):
+    """Test refresh with a malformed token."""
+    response = await client.post(
+        "/api/v1/auth/refresh",
+        headers={"Authorization": "Bearer not-a-jwt"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+async def test_repeat_refresh_token(client: AsyncClient, test_user, test_user_refresh_token):
+    """Test repeated refreshes, served from the cached user lookup."""
+    for _ in range(2):
+        response = await client.post(
+            "/api/v1/auth/refresh",
+            headers={"Authorization": f"Bearer {test_user_refresh_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "access_token" in response.json()
+
 async def test_logout(client: AsyncClient, test_user_token):
     """Test logout endpoint."""
     response = await client.post(
         "/api/v1/auth/logout",
         headers={"Authorization": f"Bearer {test_user_token}"}
     )
-    assert response.status_code == status.HTTP_200_OK 
\ No newline at end of file
+    assert response.status_code == status.HTTP_200_OK
+
+async def test_cached_refresh_token_rejected_as_access(client: AsyncClient, test_user, test_user_refresh_token):
+    """Test that a cached refresh token still fails the access token type check."""
+    response = await client.post(
+        "/api/v1/auth/refresh",
+        headers={"Authorization": f"Bearer {test_user_refresh_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    response = await client.post(
+        "/api/v1/auth/logout",
+        headers={"Authorization": f"Bearer {test_user_refresh_token}"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -65,10 +65,49 @@ async def test_get_event(client: AsyncClient, test_user_token):
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert data["id"] == event_id
+    assert response.headers["cache-control"] == "private, no-cache"
+    
+    # A matching If-None-Match short-circuits to 304
+    response = await client.get(
+        f"/api/v1/events/{event_id}",
+        headers={
+            "Authorization": f"Bearer {test_user_token}",
+            "If-None-Match": response.headers["etag"]
+        }
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+async def test_get_event_version_etag(client: AsyncClient, test_user_token):
+    """Test version ETags, and that a missing version is a 404 even with If-None-Match."""
+    event_id = await test_create_event_success(client, test_user_token)
+    
+    response = await client.get(
+        f"/api/v1/events/{event_id}/history/1",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] == f'"{event_id}-1"'
+    assert "immutable" in response.headers["cache-control"]
+    
+    response = await client.get(
+        f"/api/v1/events/{event_id}/history/1",
+        headers={"Authorization": f"Bearer {test_user_token}", "If-None-Match": f'"{event_id}-1"'}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    
+    response = await client.get(
+        f"/api/v1/events/{event_id}/history/99",
+        headers={"Authorization": f"Bearer {test_user_token}", "If-None-Match": f'"{event_id}-99"'}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
 
 async def test_update_event(client: AsyncClient, test_user_token):
     """Test updating an event."""
     event_id = await test_create_event_success(client, test_user_token)
+    await client.get(
+        f"/api/v1/events/{event_id}",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
     
     # Make sure to provide all fields that might be required
     update_data = {
@@ -89,6 +128,14 @@ async def test_update_event(client: AsyncClient, test_user_token):
     data = response.json()
     assert data["title"] == "Updated Event"
     assert data["description"] == "Updated Description"
+    
+    # The cached event details must reflect the update
+    response = await client.get(
+        f"/api/v1/events/{event_id}",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Updated Event"
 
 async def test_delete_event(client: AsyncClient, test_user_token):
     """Test deleting an event."""
@@ -155,6 +202,92 @@ async def test_batch_create_events(client: AsyncClient, test_user_token):
     assert len(data) == len(events)
     for i, event in enumerate(data):
         assert event["title"] == events[i]["title"]
+        assert event["created_at"] is not None
+
+async def test_batch_create_events_too_many(client: AsyncClient, test_user_token):
+    """Test batches over 50 events are rejected by validation."""
+    event = {
+        "title": "Event",
+        "start_time": (datetime.now(UTC) + timedelta(days=1)).isoformat(),
+        "end_time": (datetime.now(UTC) + timedelta(days=1, hours=2)).isoformat()
+    }
+    
+    response = await client.post(
+        "/api/v1/events/batch",
+        json={"events": [event] * 51},
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+async def test_list_events_paginated(client: AsyncClient, test_user_token):
+    """Test listing events reports the full total alongside one page."""
+    for offset_days in range(3):
+        await test_create_event_success(client, test_user_token, offset_days=offset_days * 2)
+    
+    response = await client.get(
+        "/api/v1/events/",
+        params={
+            "start_time": datetime.now(UTC).isoformat(),
+            "end_time": (datetime.now(UTC) + timedelta(days=30)).isoformat(),
+            "page": 1,
+            "size": 2
+        },
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] == 3
+    assert [item["title"] for item in data["items"]] == ["Test Event 0", "Test Event 2"]
+    assert data["items"][0]["start_time"].endswith("+00:00")
+    assert response.headers["cache-control"].startswith("private")
+    
+    # Continue after the last item seen with a keyset cursor
+    last = data["items"][-1]
+    response = await client.get(
+        "/api/v1/events/",
+        params={
+            "start_time": datetime.now(UTC).isoformat(),
+            "end_time": (datetime.now(UTC) + timedelta(days=30)).isoformat(),
+            "size": 2,
+            "after_start_time": last["start_time"],
+            "after_id": last["id"]
+        },
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] == 3
+    assert [item["title"] for item in data["items"]] == ["Test Event 4"]
+
+async def test_list_events_naive_range(client: AsyncClient, test_user_token):
+    """Test a naive date range is treated as UTC."""
+    await test_create_event_success(client, test_user_token)
+    
+    response = await client.get(
+        "/api/v1/events/",
+        params={
+            "start_time": datetime.now(UTC).replace(tzinfo=None).isoformat(),
+            "end_time": (datetime.now(UTC) + timedelta(days=30)).isoformat()
+        },
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 1
+
+async def test_list_events_sees_new_event(client: AsyncClient, test_user_token):
+    """Test a cached listing is invalidated when the user creates an event."""
+    params = {
+        "start_time": datetime.now(UTC).isoformat(),
+        "end_time": (datetime.now(UTC) + timedelta(days=30)).isoformat()
+    }
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    
+    response = await client.get("/api/v1/events/", params=params, headers=headers)
+    assert response.json()["total"] == 0
+    
+    await test_create_event_success(client, test_user_token)
+    response = await client.get("/api/v1/events/", params=params, headers=headers)
+    assert response.json()["total"] == 1
 
 async def test_event_conflict_detection(client: AsyncClient, test_user_token):
     """Test event conflict detection."""
@@ -194,4 +327,29 @@ async def test_event_conflict_detection(client: AsyncClient, test_user_token):
         headers={"Authorization": f"Bearer {test_user_token}"}
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert "conflicts" in response.json()["detail"].lower() 
\ No newline at end of file
+    assert "conflicts" in response.json()["detail"].lower()
+
+async def test_shared_viewer_permissions(
+    client: AsyncClient, test_user_token, second_test_user, second_user_token
+):
+    """Test a shared VIEWER can read an event but not edit it."""
+    event_id = await test_create_event_success(client, test_user_token)
+    response = await client.post(
+        f"/api/v1/events/{event_id}/share",
+        json={"user_id": second_test_user.id, "role": "VIEWER"},
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    response = await client.get(
+        f"/api/v1/events/{event_id}/history",
+        headers={"Authorization": f"Bearer {second_user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    response = await client.put(
+        f"/api/v1/events/{event_id}",
+        json={"title": "Viewer Edit"},
+        headers={"Authorization": f"Bearer {second_user_token}"}
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -2,10 +2,19 @@ import pytest
 import pytest_asyncio
 from fastapi import FastAPI, Response
 import httpx
+import io
 import json
 import logging
+import queue
 from prometheus_client.parser import text_string_to_metric_families
-from app.core.logging import setup_test_logging, RequestLoggingMiddleware, CustomJsonFormatter
+from app.core.logging import (
+    setup_test_logging,
+    RequestLoggingMiddleware,
+    CustomJsonFormatter,
+    BufferedJsonHandler,
+    BufferedQueueListener,
+    PassthroughQueueHandler
+)
 from app.core.metrics import (
     MetricsMiddleware, 
     record_db_operation,
@@ -191,4 +200,61 @@ async def test_structured_log_format(client, caplog):
         # Verify field values
         assert parsed_output["level"] == "INFO"
         assert parsed_output["name"] == "api.request"
-        assert isinstance(parsed_output.get("duration"), (int, float)) 
\ No newline at end of file
+        assert isinstance(parsed_output.get("duration"), (int, float))
+
+def test_buffered_handler_batches_writes():
+    """Test that buffered records are only written once flushed."""
+    stream = io.StringIO()
+    handler = BufferedJsonHandler(stream, flush_interval=60)
+    handler.setFormatter(CustomJsonFormatter())
+    logger = logging.getLogger("test.buffered")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("first")
+        logger.warning("second")
+        assert stream.getvalue() == ""
+        
+        handler.flush()
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == ["first", "second"]
+    finally:
+        logger.removeHandler(handler)
+
+def test_buffered_handler_writes_after_interval():
+    """Test that a record arriving after the flush interval writes the buffer."""
+    stream = io.StringIO()
+    handler = BufferedJsonHandler(stream, flush_interval=0)
+    handler.setFormatter(CustomJsonFormatter())
+    logger = logging.getLogger("test.buffered.interval")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("first")
+        assert json.loads(stream.getvalue())["message"] == "first"
+    finally:
+        logger.removeHandler(handler)
+
+def test_queued_exception_keeps_exc_info():
+    """Test that exception records reach the JSON formatter with their traceback."""
+    stream = io.StringIO()
+    handler = BufferedJsonHandler(stream)
+    handler.setFormatter(CustomJsonFormatter())
+    log_queue = queue.SimpleQueue()
+    listener = BufferedQueueListener(log_queue, handler)
+    logger = logging.getLogger("test.queued")
+    logger.propagate = False
+    logger.addHandler(PassthroughQueueHandler(log_queue))
+    listener.start()
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.error("failed", exc_info=True)
+    finally:
+        listener.stop()
+        logger.removeHandler(logger.handlers[0])
+    
+    record = json.loads(stream.getvalue())
+    assert record["message"] == "failed"
+    assert "ValueError: boom" in record["exc_info"]
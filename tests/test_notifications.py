@@ -53,6 +53,38 @@ async def test_list_notifications(client, test_user_token, test_notification):
     # Success if we reach here
     assert True
 
+async def test_list_notifications_with_token_param(client, test_user_token, test_notification):
+    """Test listing notifications authenticated via the token query parameter."""
+    response = await client.get(
+        "/api/v1/notifications/",
+        params={"token": test_user_token}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [n["id"] for n in data] == [test_notification["id"]]
+    
+    # An unchanged list short-circuits to 304
+    response = await client.get(
+        "/api/v1/notifications/",
+        params={"token": test_user_token},
+        headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+async def test_mark_all_notifications_read_endpoint(client, test_user_token, test_notification):
+    """Test the read-all endpoint marks every notification read."""
+    response = await client.put(
+        "/api/v1/notifications/read-all",
+        params={"token": test_user_token}
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    
+    response = await client.get(
+        "/api/v1/notifications/",
+        params={"token": test_user_token, "unread_only": True}
+    )
+    assert response.json() == []
+
 async def test_mark_notification_read(db_session, test_notification):
     """Test marking a notification as read."""
     from app.crud import notification as crud_notification
@@ -107,6 +139,39 @@ async def test_mark_all_notifications_read(db_session, test_user, test_notificat
     assert all(n.is_read for n in notifications)
     assert len(notifications) == 2
 
+async def test_get_user_notifications_paginated(db_session, test_user, test_notification):
+    """Test notification pages are taken newest first with skip and limit."""
+    from app.crud import notification as crud_notification
+    from app.models.notification import Notification
+    from datetime import datetime, timedelta, UTC
+    
+    # Older notifications, created one day apart
+    now = datetime.now(UTC)
+    older = [
+        Notification(
+            user_id=test_user.id,
+            event_id=test_notification["event_id"],
+            type="EVENT_REMINDER",
+            message=f"Reminder {days}",
+            data={"event_id": test_notification["event_id"], "action": "reminder"},
+            is_read=False,
+            created_at=now - timedelta(days=days),
+            updated_at=now - timedelta(days=days)
+        )
+        for days in (1, 2, 3)
+    ]
+    db_session.add_all(older)
+    await db_session.commit()
+    
+    notifications = await crud_notification.get_user_notifications(db_session, test_user.id)
+    assert [n.id for n in notifications] == [test_notification["id"]] + [n.id for n in older]
+    
+    page = await crud_notification.get_user_notifications(db_session, test_user.id, skip=1, limit=2)
+    assert [n.message for n in page] == ["Reminder 1", "Reminder 2"]
+    
+    page = await crud_notification.get_user_notifications(db_session, test_user.id, skip=3, limit=2)
+    assert [n.message for n in page] == ["Reminder 3"]
+
 async def test_websocket_connection(client, test_user_token, test_user):
     """Test WebSocket connection and message reception."""
     # Test the WebSocket manager's functionality directly
@@ -51,6 +51,16 @@ async def test_event_version_creation(client: AsyncClient, test_user_token):
     # Should have at least 2 versions (original + update)
     assert len(versions) >= 2
     
+    # Polling an unchanged history short-circuits to 304
+    response = await client.get(
+        f"/api/v1/events/{event_id}/history",
+        headers={
+            "Authorization": f"Bearer {test_user_token}",
+            "If-None-Match": response.headers["etag"]
+        }
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    
     # Check specific version
     response = await client.get(
         f"/api/v1/events/{event_id}/history/1",